@@ -3,15 +3,25 @@
 import csv
 import json
 import hashlib
+import mmap
+import os
 import random
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePath
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from datacheck.rules import RuleSet, Severity
 
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 @dataclass
 class CheckResult:
@@ -40,6 +50,40 @@ class CheckResult:
 
 SUPPORTED_EXTENSIONS = {".json", ".jsonl", ".csv"}
 
+_READ_BUFFER_SIZE = 64 * 1024
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when installed.
+
+    Input orjson rejects (NaN, oversized ints, malformed JSON) is re-parsed with
+    the stdlib so accepted values and error messages stay the same.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _load_json_file(path: Path) -> Any:
+    """Parse a whole JSON file.
+
+    With orjson the file is memory-mapped and parsed in place, so no second copy
+    of the document is held in memory next to the parsed objects.
+    """
+    with open(path, "rb") as f:
+        if HAS_ORJSON and os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    try:
+                        return orjson.loads(view)
+                    except orjson.JSONDecodeError:
+                        pass
+            return json.loads(f.read())
+        return _loads(f.read())
+
 
 @dataclass
 class BatchCheckResult:
@@ -61,6 +105,28 @@ class BatchCheckResult:
     total_info_count: int = 0
     skipped_files: List[str] = field(default_factory=list)
 
+    def add_file_result(self, rel_path: str, file_result: CheckResult) -> None:
+        """Record one file's result and add it to the running totals."""
+        self.file_results[rel_path] = file_result
+        self.total_samples += file_result.total_samples
+        self.total_passed_samples += file_result.passed_samples
+        self.total_failed_samples += file_result.failed_samples
+        self.total_error_count += file_result.error_count
+        self.total_warning_count += file_result.warning_count
+        self.total_info_count += file_result.info_count
+
+    def finalize(self) -> None:
+        """Compute aggregate pass rate and passed/failed file counts."""
+        if self.total_samples > 0:
+            self.overall_pass_rate = self.total_passed_samples / self.total_samples
+        else:
+            self.overall_pass_rate = 1.0
+
+        self.passed_files = sum(
+            1 for r in self.file_results.values() if r.error_count == 0
+        )
+        self.failed_files = self.total_files - self.passed_files - len(self.skipped_files)
+
 
 class DataChecker:
     """Check data quality against rules and schema.
@@ -108,18 +174,21 @@ class DataChecker:
         sample_failures = defaultdict(list)
         passed_count = 0
 
+        # Resolve enabled rules and their stats entries once, not per sample
+        rules = [(rule, rule_stats[rule.id]) for rule in self.ruleset.get_enabled_rules()]
+
         for i, sample in enumerate(samples):
             sample_id = sample.get("id", f"sample_{i}")
             sample_has_error = False  # Only ERROR severity counts as failure
 
-            for rule in self.ruleset.get_enabled_rules():
+            for rule, stats in rules:
                 rule_result = rule.check(sample, schema)
 
                 if rule_result.passed:
-                    rule_stats[rule.id]["passed"] += 1
+                    stats["passed"] += 1
                 else:
-                    rule_stats[rule.id]["failed"] += 1
-                    rule_stats[rule.id]["sample_ids"].append(sample_id)
+                    stats["failed"] += 1
+                    stats["sample_ids"].append(sample_id)
                     sample_failures[sample_id].append(rule_result)
 
                     # Count by severity - only ERROR marks sample as failed
@@ -191,24 +260,11 @@ class DataChecker:
         """
         suffix = data_path.suffix.lower()
 
-        if suffix == ".jsonl":
-            samples = []
-            with open(data_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        samples.append(json.loads(line))
-            return samples, {}
-
-        elif suffix == ".csv":
-            with open(data_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                samples = list(reader)
-            return samples, {}
+        if suffix in (".jsonl", ".csv"):
+            return list(DataChecker.iter_data(data_path)), {}
 
         else:  # .json default
-            with open(data_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = _load_json_file(data_path)
 
             if isinstance(data, list):
                 return data, {}
@@ -217,6 +273,29 @@ class DataChecker:
             schema = data.get("schema", {})
             return samples, schema
 
+    @staticmethod
+    def iter_data(data_path: Path) -> Iterator[Dict[str, Any]]:
+        """Iterate samples from a data file one record at a time.
+
+        JSONL and CSV are streamed through a 64KB buffered reader. A .json
+        document has to be parsed whole, so its samples are yielded after loading.
+        """
+        suffix = data_path.suffix.lower()
+
+        if suffix == ".jsonl":
+            with open(data_path, "rb", buffering=_READ_BUFFER_SIZE) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield _loads(line)
+
+        elif suffix == ".csv":
+            with open(data_path, "r", encoding="utf-8", buffering=_READ_BUFFER_SIZE) as f:
+                yield from csv.DictReader(f)
+
+        else:
+            yield from DataChecker._load_data(data_path)[0]
+
     def check_file(
         self,
         data_path: str,
@@ -307,20 +386,7 @@ class DataChecker:
             result.error = f"不是目录: {dir_path}"
             return result
 
-        # Collect files
-        if patterns is None:
-            patterns = [f"*{ext}" for ext in SUPPORTED_EXTENSIONS]
-
-        files: set = set()
-        for pat in patterns:
-            files.update(dir_path.rglob(pat))
-
-        # Filter to supported extensions and sort
-        file_list = sorted(
-            f for f in files
-            if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS
-        )
-
+        file_list = self.collect_files(dir_path, patterns)
         result.total_files = len(file_list)
 
         if not file_list:
@@ -341,28 +407,43 @@ class DataChecker:
                     sample_count=sample_count,
                     sample_rate=sample_rate,
                 )
-                result.file_results[rel_path] = file_result
-                result.total_samples += file_result.total_samples
-                result.total_passed_samples += file_result.passed_samples
-                result.total_failed_samples += file_result.failed_samples
-                result.total_error_count += file_result.error_count
-                result.total_warning_count += file_result.warning_count
-                result.total_info_count += file_result.info_count
+                result.add_file_result(rel_path, file_result)
             except Exception as e:
                 result.skipped_files.append(f"{rel_path}: {e}")
 
-        # Aggregate
-        if result.total_samples > 0:
-            result.overall_pass_rate = result.total_passed_samples / result.total_samples
-        else:
-            result.overall_pass_rate = 1.0
+        result.finalize()
+        return result
 
-        result.passed_files = sum(
-            1 for r in result.file_results.values() if r.error_count == 0
-        )
-        result.failed_files = result.total_files - result.passed_files - len(result.skipped_files)
+    @staticmethod
+    def collect_files(dir_path: Path, patterns: Optional[List[str]] = None) -> List[Path]:
+        """Recursively collect supported data files matching ``patterns``, sorted.
 
-        return result
+        Args:
+            dir_path: Directory to scan
+            patterns: File glob patterns (default: *.json, *.jsonl, *.csv)
+        """
+        # One os.scandir walk tests every pattern per entry, instead of a full
+        # rglob pass per pattern
+        suffixes = tuple(SUPPORTED_EXTENSIONS)
+        name_pats = [p for p in patterns or () if "/" not in p]
+        path_pats = [p for p in patterns or () if "/" in p]
+
+        files: List[Path] = []
+        stack = [str(dir_path)]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif not entry.name.lower().endswith(suffixes) or not entry.is_file():
+                        continue
+                    elif (
+                        patterns is None
+                        or any(fnmatchcase(entry.name, p) for p in name_pats)
+                        or any(PurePath(entry.path).match(p) for p in path_pats)
+                    ):
+                        files.append(Path(entry.path))
+        return sorted(files)
 
     def check_from_datarecipe(
         self,
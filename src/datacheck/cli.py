@@ -322,13 +322,7 @@ def rules():
 
     for rule in ruleset.rules.values():
         status = "✓" if rule.enabled else "✗"
-        severity_icon = {
-            "error": "🔴",
-            "warning": "🟡",
-            "info": "🔵",
-        }.get(rule.severity.value, "⚪")
-
-        click.echo(f"\n{status} [{rule.id}] {rule.name} {severity_icon}")
+        click.echo(f"\n{status} [{rule.id}] {rule.name} {rule.severity.icon}")
         click.echo(f"   {rule.description}")
 
     click.echo("\n" + "=" * 50)
@@ -21,6 +21,8 @@ class FixResult:
     details: Dict[str, Any] = field(default_factory=dict)
 
 
+_WRITE_BUFFER_SIZE = 64 * 1024
+
 # PII patterns for redaction
 _PII_PATTERNS = [
     (re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"), "[EMAIL]"),
@@ -112,9 +114,11 @@ class DataFixer:
         # Save as JSONL
         out = Path(output_path)
         out.parent.mkdir(parents=True, exist_ok=True)
-        with open(out, "w", encoding="utf-8") as f:
-            for sample in fixed:
-                f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+        with open(out, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.writelines(
+                (json.dumps(sample, ensure_ascii=False) + "\n").encode("utf-8")
+                for sample in fixed
+            )
 
         return result
 
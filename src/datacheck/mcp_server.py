@@ -1,11 +1,21 @@
 """DataCheck MCP Server - Model Context Protocol 服务."""
 
+import asyncio
+import io
 import math
-from collections import Counter
+import multiprocessing
+import os
+import sys
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
 
 try:
+    import anyio
     from mcp.server import Server
     from mcp.server.stdio import stdio_server
     from mcp.types import Tool, TextContent
@@ -14,824 +24,1393 @@ try:
 except ImportError:
     HAS_MCP = False
 
-from datacheck.checker import DataChecker
-from datacheck.fixer import DataFixer
-from datacheck.report import QualityReport
-from datacheck.rules import RuleSet, get_sft_ruleset, get_preference_ruleset
-
+try:
+    import fastjsonschema
 
-def create_server() -> "Server":
-    """创建 MCP 服务器实例."""
-    if not HAS_MCP:
-        raise ImportError("MCP 未安装。请运行: pip install datacheck[mcp]")
+    HAS_FASTJSONSCHEMA = True
+except ImportError:
+    HAS_FASTJSONSCHEMA = False
 
-    server = Server("datacheck")
+try:
+    import numpy as np
 
-    @server.list_tools()
-    async def list_tools() -> List[Tool]:
-        """列出可用的工具."""
-        return [
-            Tool(
-                name="check_data_quality",
-                description="检查数据文件的质量 (支持 JSON/JSONL/CSV)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "data_path": {
-                            "type": "string",
-                            "description": "数据文件路径 (JSON/JSONL/CSV)",
-                        },
-                        "schema_path": {
-                            "type": "string",
-                            "description": "Schema 文件路径（可选）",
-                        },
-                        "ruleset": {
-                            "type": "string",
-                            "enum": ["default", "sft", "preference"],
-                            "description": "规则集（默认: default）",
-                        },
-                        "sample_count": {
-                            "type": "integer",
-                            "description": "随机抽样数量（可选）",
-                        },
-                        "sample_rate": {
-                            "type": "number",
-                            "description": "随机抽样比例 0-1（可选）",
-                        },
-                    },
-                    "required": ["data_path"],
-                },
-            ),
-            Tool(
-                name="validate_from_datarecipe",
-                description="使用 DataRecipe 分析结果验证数据",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "analysis_dir": {
-                            "type": "string",
-                            "description": "DataRecipe 分析输出目录",
-                        },
-                        "data_path": {
-                            "type": "string",
-                            "description": "要验证的数据文件（可选，默认验证合成数据）",
-                        },
-                    },
-                    "required": ["analysis_dir"],
-                },
-            ),
-            Tool(
-                name="compare_distributions",
-                description="对比多个数据文件的分布 (支持 JSON/JSONL/CSV)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "file_paths": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "要对比的数据文件路径列表 (JSON/JSONL/CSV)",
-                        },
-                    },
-                    "required": ["file_paths"],
-                },
-            ),
-            Tool(
-                name="list_quality_rules",
-                description="列出所有可用的质量检查规则",
-                inputSchema={
-                    "type": "object",
-                    "properties": {},
-                },
-            ),
-            Tool(
-                name="infer_schema",
-                description="从数据文件推断 Schema (字段类型、约束、必填项)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "data_path": {
-                            "type": "string",
-                            "description": "数据文件路径 (JSON/JSONL/CSV)",
-                        },
-                        "output_path": {
-                            "type": "string",
-                            "description": "Schema 输出路径（可选）",
-                        },
-                    },
-                    "required": ["data_path"],
-                },
-            ),
-            Tool(
-                name="fix_data",
-                description="修复数据文件常见质量问题 (去重、去空白、PII 脱敏)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "data_path": {
-                            "type": "string",
-                            "description": "数据文件路径 (JSON/JSONL/CSV)",
-                        },
-                        "output_path": {
-                            "type": "string",
-                            "description": "修复后文件输出路径 (JSONL)",
-                        },
-                        "strip_pii": {
-                            "type": "boolean",
-                            "description": "是否脱敏 PII 信息（默认: false）",
-                        },
-                    },
-                    "required": ["data_path", "output_path"],
-                },
-            ),
-            Tool(
-                name="batch_check_directory",
-                description="批量检查目录下所有数据文件的质量 (递归扫描 JSON/JSONL/CSV)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "directory": {
-                            "type": "string",
-                            "description": "要检查的目录路径",
-                        },
-                        "schema_path": {
-                            "type": "string",
-                            "description": "Schema 文件路径（可选）",
-                        },
-                        "ruleset": {
-                            "type": "string",
-                            "enum": ["default", "sft", "preference"],
-                            "description": "规则集（默认: default）",
-                        },
-                        "pattern": {
-                            "type": "string",
-                            "description": "文件匹配模式，逗号分隔（默认: *.json,*.jsonl,*.csv）",
-                        },
-                        "sample_count": {
-                            "type": "integer",
-                            "description": "每个文件的随机抽样数量（可选）",
-                        },
-                    },
-                    "required": ["directory"],
-                },
-            ),
-            Tool(
-                name="check_drift",
-                description="检测两个数据文件之间的分布漂移（数值统计差异、类别分布变化、文本特征对比）",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "data_path_a": {
-                            "type": "string",
-                            "description": "数据文件 A 路径 (JSON/JSONL/CSV)",
-                        },
-                        "data_path_b": {
-                            "type": "string",
-                            "description": "数据文件 B 路径 (JSON/JSONL/CSV)",
-                        },
-                        "fields": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "要对比的字段列表（可选，默认对比所有共有字段）",
-                        },
-                    },
-                    "required": ["data_path_a", "data_path_b"],
-                },
-            ),
-            Tool(
-                name="check_leakage",
-                description="检测训练集和测试集之间的数据泄漏（完全重复 + token Jaccard 近似重复）",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "train_path": {
-                            "type": "string",
-                            "description": "训练集文件路径 (JSON/JSONL/CSV)",
-                        },
-                        "test_path": {
-                            "type": "string",
-                            "description": "测试集文件路径 (JSON/JSONL/CSV)",
-                        },
-                        "key_fields": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "用于比较的字段（可选，自动检测文本字段）",
-                        },
-                        "threshold": {
-                            "type": "number",
-                            "description": "近似重复的 Jaccard 相似度阈值（默认 0.9）",
-                            "default": 0.9,
-                        },
-                    },
-                    "required": ["train_path", "test_path"],
-                },
-            ),
-            Tool(
-                name="check_bias",
-                description="检测数据集偏差（类别不均衡、文本长度分布偏差、语言分布偏差）",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "data_path": {
-                            "type": "string",
-                            "description": "数据文件路径 (JSON/JSONL/CSV)",
-                        },
-                        "label_field": {
-                            "type": "string",
-                            "description": "标签字段名（可选，自动检测）",
-                        },
-                        "text_field": {
-                            "type": "string",
-                            "description": "文本字段名（可选，自动检测）",
-                        },
-                        "dimensions": {
-                            "type": "array",
-                            "items": {
-                                "type": "string",
-                                "enum": ["category", "length", "language", "all"],
-                            },
-                            "description": "检测维度（默认 all）",
-                            "default": ["all"],
-                        },
-                    },
-                    "required": ["data_path"],
-                },
-            ),
-            Tool(
-                name="check_coverage",
-                description="检测数据集覆盖度 — 统计字段完整度、缺失值比例、唯一值分布",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "data_path": {
-                            "type": "string",
-                            "description": "数据文件路径 (JSON/JSONL/CSV)",
-                        },
-                        "sample_count": {
-                            "type": "integer",
-                            "description": "采样数量（可选，默认全量检测）",
-                        },
-                    },
-                    "required": ["data_path"],
-                },
-            ),
-        ]
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 
-    @server.call_tool()
-    async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
-        """调用工具."""
+try:
+    import xxhash
 
-        if name == "check_data_quality":
-            ruleset_name = arguments.get("ruleset", "default")
-            if ruleset_name == "sft":
-                rules = get_sft_ruleset()
-            elif ruleset_name == "preference":
-                rules = get_preference_ruleset()
-            else:
-                rules = RuleSet()
-
-            checker = DataChecker(rules)
-            result = checker.check_file(
-                arguments["data_path"],
-                arguments.get("schema_path"),
-                sample_count=arguments.get("sample_count"),
-                sample_rate=arguments.get("sample_rate"),
-            )
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
 
-            if not result.success:
-                return [TextContent(type="text", text=f"检查失败: {result.error}")]
-
-            # Generate summary
-            score = result.pass_rate * 100
-            if score >= 90:
-                grade = "🟢 优秀"
-            elif score >= 70:
-                grade = "🟡 良好"
-            elif score >= 50:
-                grade = "🟠 一般"
-            else:
-                grade = "🔴 需改进"
+try:
+    import uvloop
 
-            summary = f"""## 数据质量检查结果
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
 
-### 概要
-- 总样本: {result.total_samples}
-- 通过: {result.passed_samples}
-- 失败: {result.failed_samples}
-- **通过率: {result.pass_rate:.1%}**
-- **评级: {grade}**
+from datacheck.checker import BatchCheckResult, CheckResult, DataChecker
+from datacheck.fixer import DataFixer
+from datacheck.report import QualityReport
+from datacheck.rules import RuleSet, get_sft_ruleset, get_preference_ruleset
+from datacheck.text_rules import (
+    MinHashLSH,
+    TokenBitsets,
+    cjk_latin_counts,
+    minhash_signature,
+)
+
+
+_TOOL_DEFS: List[Dict[str, Any]] = [
+    {
+        "name": "check_data_quality",
+        "description": "检查数据文件的质量 (支持 JSON/JSONL/CSV)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "data_path": {
+                    "type": "string",
+                    "description": "数据文件路径 (JSON/JSONL/CSV)",
+                },
+                "schema_path": {
+                    "type": "string",
+                    "description": "Schema 文件路径（可选）",
+                },
+                "ruleset": {
+                    "type": "string",
+                    "enum": ["default", "sft", "preference"],
+                    "description": "规则集（默认: default）",
+                },
+                "sample_count": {
+                    "type": "integer",
+                    "description": "随机抽样数量（可选）",
+                },
+                "sample_rate": {
+                    "type": "number",
+                    "description": "随机抽样比例 0-1（可选）",
+                },
+            },
+            "required": ["data_path"],
+        },
+    },
+    {
+        "name": "validate_from_datarecipe",
+        "description": "使用 DataRecipe 分析结果验证数据",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "analysis_dir": {
+                    "type": "string",
+                    "description": "DataRecipe 分析输出目录",
+                },
+                "data_path": {
+                    "type": "string",
+                    "description": "要验证的数据文件（可选，默认验证合成数据）",
+                },
+            },
+            "required": ["analysis_dir"],
+        },
+    },
+    {
+        "name": "compare_distributions",
+        "description": "对比多个数据文件的分布 (支持 JSON/JSONL/CSV)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "file_paths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "要对比的数据文件路径列表 (JSON/JSONL/CSV)",
+                },
+            },
+            "required": ["file_paths"],
+        },
+    },
+    {
+        "name": "list_quality_rules",
+        "description": "列出所有可用的质量检查规则",
+        "inputSchema": {
+            "type": "object",
+            "properties": {},
+        },
+    },
+    {
+        "name": "infer_schema",
+        "description": "从数据文件推断 Schema (字段类型、约束、必填项)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "data_path": {
+                    "type": "string",
+                    "description": "数据文件路径 (JSON/JSONL/CSV)",
+                },
+                "output_path": {
+                    "type": "string",
+                    "description": "Schema 输出路径（可选）",
+                },
+            },
+            "required": ["data_path"],
+        },
+    },
+    {
+        "name": "fix_data",
+        "description": "修复数据文件常见质量问题 (去重、去空白、PII 脱敏)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "data_path": {
+                    "type": "string",
+                    "description": "数据文件路径 (JSON/JSONL/CSV)",
+                },
+                "output_path": {
+                    "type": "string",
+                    "description": "修复后文件输出路径 (JSONL)",
+                },
+                "strip_pii": {
+                    "type": "boolean",
+                    "description": "是否脱敏 PII 信息（默认: false）",
+                },
+            },
+            "required": ["data_path", "output_path"],
+        },
+    },
+    {
+        "name": "batch_check_directory",
+        "description": "批量检查目录下所有数据文件的质量 (递归扫描 JSON/JSONL/CSV)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "directory": {
+                    "type": "string",
+                    "description": "要检查的目录路径",
+                },
+                "schema_path": {
+                    "type": "string",
+                    "description": "Schema 文件路径（可选）",
+                },
+                "ruleset": {
+                    "type": "string",
+                    "enum": ["default", "sft", "preference"],
+                    "description": "规则集（默认: default）",
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "文件匹配模式，逗号分隔（默认: *.json,*.jsonl,*.csv）",
+                },
+                "sample_count": {
+                    "type": "integer",
+                    "description": "每个文件的随机抽样数量（可选）",
+                },
+                "max_workers": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "并行检查的进程数（可选，默认 CPU 核数；1 表示串行）",
+                },
+            },
+            "required": ["directory"],
+        },
+    },
+    {
+        "name": "check_drift",
+        "description": "检测两个数据文件之间的分布漂移（数值统计差异、类别分布变化、文本特征对比）",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "data_path_a": {
+                    "type": "string",
+                    "description": "数据文件 A 路径 (JSON/JSONL/CSV)",
+                },
+                "data_path_b": {
+                    "type": "string",
+                    "description": "数据文件 B 路径 (JSON/JSONL/CSV)",
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "要对比的字段列表（可选，默认对比所有共有字段）",
+                },
+            },
+            "required": ["data_path_a", "data_path_b"],
+        },
+    },
+    {
+        "name": "check_leakage",
+        "description": "检测训练集和测试集之间的数据泄漏（完全重复 + token Jaccard 近似重复）",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "train_path": {
+                    "type": "string",
+                    "description": "训练集文件路径 (JSON/JSONL/CSV)",
+                },
+                "test_path": {
+                    "type": "string",
+                    "description": "测试集文件路径 (JSON/JSONL/CSV)",
+                },
+                "key_fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "用于比较的字段（可选，自动检测文本字段）",
+                },
+                "threshold": {
+                    "type": "number",
+                    "description": "近似重复的 Jaccard 相似度阈值（默认 0.9）",
+                    "default": 0.9,
+                },
+            },
+            "required": ["train_path", "test_path"],
+        },
+    },
+    {
+        "name": "check_bias",
+        "description": "检测数据集偏差（类别不均衡、文本长度分布偏差、语言分布偏差）",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "data_path": {
+                    "type": "string",
+                    "description": "数据文件路径 (JSON/JSONL/CSV)",
+                },
+                "label_field": {
+                    "type": "string",
+                    "description": "标签字段名（可选，自动检测）",
+                },
+                "text_field": {
+                    "type": "string",
+                    "description": "文本字段名（可选，自动检测）",
+                },
+                "dimensions": {
+                    "type": "array",
+                    "items": {
+                        "type": "string",
+                        "enum": ["category", "length", "language", "all"],
+                    },
+                    "description": "检测维度（默认 all）",
+                    "default": ["all"],
+                },
+            },
+            "required": ["data_path"],
+        },
+    },
+    {
+        "name": "check_coverage",
+        "description": "检测数据集覆盖度 — 统计字段完整度、缺失值比例、唯一值分布",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "data_path": {
+                    "type": "string",
+                    "description": "数据文件路径 (JSON/JSONL/CSV)",
+                },
+                "sample_count": {
+                    "type": "integer",
+                    "description": "采样数量（可选，默认全量检测）",
+                },
+            },
+            "required": ["data_path"],
+        },
+    },
+]
 
-### 问题统计
-- 🔴 错误: {result.error_count}
-- 🟡 警告: {result.warning_count}
-- 🔵 提示: {result.info_count}
-"""
 
-            if result.duplicates:
-                summary += f"\n### 重复检测\n发现 {len(result.duplicates)} 组重复数据\n"
+def _compile_validators() -> Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]]:
+    """预编译各工具 inputSchema 的参数校验器 (需要 fastjsonschema)."""
+    if not HAS_FASTJSONSCHEMA:
+        return {}
+    return {
+        tool_def["name"]: fastjsonschema.compile(tool_def["inputSchema"])
+        for tool_def in _TOOL_DEFS
+    }
 
-            if result.failed_sample_ids:
-                summary += f"\n### 失败样本\n{', '.join(result.failed_sample_ids[:10])}"
-                if len(result.failed_sample_ids) > 10:
-                    summary += f" (还有 {len(result.failed_sample_ids) - 10} 个...)"
 
-            return [TextContent(type="text", text=summary)]
+_ARG_VALIDATORS = _compile_validators()
 
-        elif name == "validate_from_datarecipe":
-            checker = DataChecker()
-            result = checker.check_from_datarecipe(
-                arguments["analysis_dir"],
-                arguments.get("data_path"),
-            )
+# 工具列表在导入时构建一次，list_tools 直接复用
+_TOOLS: tuple = tuple(Tool(**tool_def) for tool_def in _TOOL_DEFS) if HAS_MCP else ()
 
-            if not result.success:
-                return [TextContent(type="text", text=f"验证失败: {result.error}")]
-
-            report = QualityReport(result, title="数据验证报告")
-
-            # Save report
-            output_dir = Path(arguments["analysis_dir"]) / "12_质检报告"
-            output_dir.mkdir(exist_ok=True)
-            output_path = output_dir / "quality_report.md"
-            report.save(str(output_path), "markdown")
-
-            # Return summary
-            score = result.pass_rate * 100
-            grade = (
-                "🟢 优秀"
-                if score >= 90
-                else "🟡 良好"
-                if score >= 70
-                else "🟠 一般"
-                if score >= 50
-                else "🔴 需改进"
-            )
 
-            return [
-                TextContent(
-                    type="text",
-                    text=f"""## 数据验证完成
+_VALIDATE_TEMPLATE = """## 数据验证完成
 
 ### 结果
-- 通过率: **{result.pass_rate:.1%}**
+- 通过率: **{pass_rate:.1%}**
 - 评级: **{grade}**
-- 总样本: {result.total_samples}
-- 错误: {result.error_count}, 警告: {result.warning_count}
+- 总样本: {total_samples}
+- 错误: {error_count}, 警告: {warning_count}
 
 ### 报告
 已保存到: {output_path}
 
-{"### 重复数据" + chr(10) + f"发现 {len(result.duplicates)} 组重复" if result.duplicates else ""}
-""",
-                )
-            ]
-
-        elif name == "compare_distributions":
-            file_paths = arguments["file_paths"]
-
-            if len(file_paths) < 2:
-                return [TextContent(type="text", text="错误: 至少需要 2 个文件")]
-
-            distributions = []
-            for file_path in file_paths:
-                checker = DataChecker()
-                samples, _ = checker._load_data(Path(file_path))
-                result = checker.check(samples, {})
-
-                distributions.append(
-                    {
-                        "file": Path(file_path).name,
-                        "count": len(samples),
-                        "dist": result.distribution,
-                    }
-                )
-
-            # Build comparison
-            lines = ["## 数据分布对比", ""]
-            lines.append("| 文件 | 样本数 |")
-            lines.append("|------|--------|")
-            for d in distributions:
-                lines.append(f"| {d['file']} | {d['count']} |")
-
-            lines.extend(["", "### 字段统计", ""])
-
-            all_fields = set()
-            for d in distributions:
-                all_fields.update(d["dist"].get("fields", {}).keys())
-
-            for field in sorted(all_fields):
-                lines.append(f"**{field}**:")
-                for d in distributions:
-                    field_data = d["dist"].get("fields", {}).get(field, {})
-                    if "length_stats" in field_data:
-                        stats = field_data["length_stats"]
-                        lines.append(f"- {d['file']}: 长度 {stats['avg']:.0f} (avg)")
-
-            return [TextContent(type="text", text="\n".join(lines))]
-
-        elif name == "list_quality_rules":
-            ruleset = RuleSet()
-            lines = ["## 可用质量检查规则", ""]
+{dup_section}
+"""
 
-            for rule in ruleset.rules.values():
-                severity_icon = {"error": "🔴", "warning": "🟡", "info": "🔵"}.get(
-                    rule.severity.value, "⚪"
-                )
-                status = "✓" if rule.enabled else "✗"
-                lines.append(f"- {status} **{rule.name}** {severity_icon}")
-                lines.append(f"  - ID: `{rule.id}`")
-                lines.append(f"  - {rule.description}")
-                lines.append("")
 
+def _percentiles(values: array, qs: List[float]) -> List[float]:
+    """线性插值分位数，与 numpy.percentile 默认方法一致."""
+    if HAS_NUMPY:
+        return np.percentile(np.frombuffer(values, dtype=np.float64), qs).tolist()
+    ordered = sorted(values)
+    result = []
+    for q in qs:
+        pos = (len(ordered) - 1) * q / 100
+        lo = math.floor(pos)
+        hi = min(lo + 1, len(ordered) - 1)
+        result.append(ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo))
+    return result
+
+
+def _ks_statistic(a: array, b: array) -> float:
+    """两样本 Kolmogorov-Smirnov 统计量 D = max|F_a - F_b|."""
+    if HAS_NUMPY:
+        sa = np.sort(np.frombuffer(a, dtype=np.float64))
+        sb = np.sort(np.frombuffer(b, dtype=np.float64))
+        points = np.concatenate([sa, sb])
+        cdf_a = np.searchsorted(sa, points, side="right") / len(sa)
+        cdf_b = np.searchsorted(sb, points, side="right") / len(sb)
+        return float(np.abs(cdf_a - cdf_b).max())
+    sa, sb = sorted(a), sorted(b)
+    i = j = 0
+    d = 0.0
+    while i < len(sa) and j < len(sb):
+        x = min(sa[i], sb[j])
+        while i < len(sa) and sa[i] <= x:
+            i += 1
+        while j < len(sb) and sb[j] <= x:
+            j += 1
+        d = max(d, abs(i / len(sa) - j / len(sb)))
+    return d
+
+
+def _tv_distance(dist_a: Counter, dist_b: Counter) -> float:
+    """类别分布的总变差距离 TV = 0.5 * sum|p_a - p_b|."""
+    na = sum(dist_a.values()) or 1
+    nb = sum(dist_b.values()) or 1
+    return 0.5 * sum(abs(dist_a[c] / na - dist_b[c] / nb) for c in dist_a.keys() | dist_b.keys())
+
+
+# 超过该阈值判定为分布漂移
+_DRIFT_KS_THRESHOLD = 0.2
+_DRIFT_TV_THRESHOLD = 0.1
+
+
+# check_drift / check_bias: buffered values are counted in batches of this size
+_COUNT_BATCH_SIZE = 4096
+
+# check_drift: per-file value counters stop (and are cleared) past this many distinct
+# values, so they stay bounded for high-cardinality columns. Such a field is still
+# reported as categorical, without a TV score, unless its distinct count alone
+# proves it is free text.
+_DRIFT_MAX_DISTINCT = 10000
+
+
+def _drift_field_stats(samples: Iterable[Dict[str, Any]], fields: List[str]) -> tuple:
+    """单次遍历累计 check_drift 所需的字段统计，不保留样本.
+
+    Returns:
+        (sample_count, {field: stats}) tuple
+    """
+    stats = {
+        f: {
+            "present": 0,
+            "num_count": 0, "num_sum": 0, "num_min": None, "num_max": None,
+            # 数值 (float64)，用于精确分位数和 KS; 内存随样本数线性增长 (8 字节/值)
+            "nums": array("d"),
+            "str_count": 0,
+            "strs": Counter(),  # 字符串值
+            "others": Counter(),  # 非字符串值的 str() 形式
+            "overflow": False,  # 不同取值超过上限，不再计数
+            "overflow_strs": 0,  # 溢出时已见的不同字符串数 (去重数下界)
+            "len_count": 0, "len_sum": 0,
+        }
+        for f in fields
+    }
+    # 字符串值先缓冲，再批量 Counter.update (C 实现的计数循环)
+    str_bufs: Dict[str, List[str]] = {f: [] for f in fields}
+    other_bufs: Dict[str, List[str]] = {f: [] for f in fields}
+
+    def _flush() -> None:
+        for f in fields:
+            fs = stats[f]
+            fs["str_count"] += len(str_bufs[f])
+            if not fs["overflow"]:
+                fs["strs"].update(str_bufs[f])
+                fs["others"].update(other_bufs[f])
+                if len(fs["strs"]) + len(fs["others"]) > _DRIFT_MAX_DISTINCT:
+                    fs["overflow"] = True
+                    fs["overflow_strs"] = len(fs["strs"])
+                    fs["strs"].clear()
+                    fs["others"].clear()
+            str_bufs[f].clear()
+            other_bufs[f].clear()
+
+    count = 0
+    for s in samples:
+        count += 1
+        if count % _COUNT_BATCH_SIZE == 0:
+            _flush()
+        for f in fields:
+            if f not in s:
+                continue
+            v = s[f]
+            fs = stats[f]
+            fs["present"] += 1
+            if isinstance(v, (int, float)):
+                fs["num_count"] += 1
+                fs["num_sum"] += v
+                fs["nums"].append(v)
+                if fs["num_min"] is None or v < fs["num_min"]:
+                    fs["num_min"] = v
+                if fs["num_max"] is None or v > fs["num_max"]:
+                    fs["num_max"] = v
+            if isinstance(v, str):
+                str_bufs[f].append(v)
+            else:
+                other_bufs[f].append(str(v))
+            if v:
+                fs["len_count"] += 1
+                fs["len_sum"] += len(str(v))
+    _flush()
+    return count, stats
+
+
+def _build_ruleset(ruleset_name: str) -> RuleSet:
+    """按名称构建规则集."""
+    if ruleset_name == "sft":
+        return get_sft_ruleset()
+    elif ruleset_name == "preference":
+        return get_preference_ruleset()
+    return RuleSet()
+
+
+_CHECK_CACHE_SIZE = 128
+# (data_path, data_stat, ruleset, schema_path, schema_stat) -> 回复文本，
+# stat 为 (st_mtime_ns, st_size)，文件变化后自动失效. 只缓存渲染后的摘要
+# (几 KB)，不持有 CheckResult 中的失败样本、分布等大对象
+_CHECK_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+
+# 小于该大小的文件直接在事件循环内检查，避免进程间传输开销
+_OFFLOAD_MIN_BYTES = 1024 * 1024
+
+# check_leakage: candidate lists at least this long are scored with packed bitsets
+_BITSET_MIN_CANDIDATES = 64
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+
+# 工作进程启动方式: 服务器已有 stdin/stdout 工作线程, fork 多线程进程可能继承被占用的锁而死锁
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """惰性创建共享进程池."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=_MP_CONTEXT)
+    return _EXECUTOR
+
+
+def _check_worker(
+    data_path: str,
+    schema_path: Optional[str],
+    ruleset_name: str,
+    sample_count: Optional[int],
+    sample_rate: Optional[float],
+) -> CheckResult:
+    """在工作进程中执行检查; 规则集按名称重建，避免 pickle check_fn."""
+    checker = DataChecker(_build_ruleset(ruleset_name))
+    return checker.check_file(
+        data_path,
+        schema_path,
+        sample_count=sample_count,
+        sample_rate=sample_rate,
+    )
+
+
+async def _run_check(
+    data_path: str,
+    schema_path: Optional[str],
+    ruleset_name: str,
+    sample_count: Optional[int] = None,
+    sample_rate: Optional[float] = None,
+) -> CheckResult:
+    """执行检查，大文件交给进程池以免阻塞事件循环."""
+    args = (data_path, schema_path, ruleset_name, sample_count, sample_rate)
+    if os.path.getsize(data_path) < _OFFLOAD_MIN_BYTES:
+        return _check_worker(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), _check_worker, *args)
+
+
+@dataclass(slots=True)
+class DocSig:
+    """check_leakage 中单条样本的比较签名."""
+
+    key: Hashable  # 拼接字段的 xxh3-128 摘要 (int)，未安装 xxhash 时为原字符串
+    tokens: frozenset
+    n: int
+
+
+def _doc_sig(sample: Dict[str, Any], fields: List[str]) -> DocSig:
+    """一次遍历字段，同时得到精确匹配键与 Jaccard 用的词集合."""
+    parts = [str(sample.get(f, "")).strip() for f in fields]
+    tokens = frozenset(" ".join(parts).lower().split())
+    key = "|||".join(parts)
+    if HAS_XXHASH:
+        # 128 位摘要碰撞概率可忽略，定长 int 键比长文本更省内存、哈希更快
+        key = xxhash.xxh3_128_intdigest(key.encode("utf-8", "surrogatepass"))
+    return DocSig(key, tokens, len(tokens))
+
+
+# check_bias: row formatters for the category / language tables
+_BIAS_CAT_ROW = "| {} | {} | {:.1f}% |\n".format
+_BIAS_LANG_ROW = "- {}: {} ({:.1f}%)\n".format
+
+# check_bias: texts are classified by language in batches of this many samples
+_LANG_BATCH_SIZE = 1024
+
+
+# check_bias: language labels depend only on the first this many characters
+_LANG_HEAD_CHARS = 500
+
+_LANG_LABEL_CACHE_SIZE = 4096
+# 文本键 -> 语言标签; 代理循环中对同一数据集反复调用 check_bias 时跳过重复扫描.
+# 每次调用只缓存前 _LANG_LABEL_CACHE_SIZE 条文本, 大数据集重跑时这些文本命中,
+# 其余文本不做查找、写入和 LRU 调整
+_LANG_LABEL_CACHE: "OrderedDict[Hashable, str]" = OrderedDict()
+
+
+def _lang_cache_key(text: str) -> Hashable:
+    """短文本以自身为键; 长文本用 (长度, hash) 作键, 不切片也不持有原文."""
+    return text if len(text) <= _LANG_HEAD_CHARS else (len(text), hash(text))
+
+
+def _classify_languages(texts: List[str], lang_counter: Counter, use_cache: bool = True) -> None:
+    """按前 500 字符的 CJK / 拉丁字符占比统计语言分布 (zh / en / other).
+
+    前 500 字符的截取只在 cjk_latin_counts(max_chars=...) 中进行，这里不切片.
+    """
+    cache = _LANG_LABEL_CACHE
+    if use_cache:
+        keys = [_lang_cache_key(text) for text in texts]
+        labels = [cache.get(key) for key in keys]
+    else:
+        labels = [None] * len(texts)
+    misses = []
+    for i, label in enumerate(labels):
+        if label is None:
+            text = texts[i]
+            if text.isspace() or text.isdigit():
+                # 纯空白 / 纯数字没有 CJK 或拉丁字符, 不必扫描
+                labels[i] = "other"
+            else:
+                misses.append(i)
+    if misses:
+        miss_texts = [texts[i] for i in misses]
+        counts = cjk_latin_counts(miss_texts, max_chars=_LANG_HEAD_CHARS)
+        for i, (cjk, latin) in zip(misses, counts):
+            # 占比 > 0.3 用整数比较: x / total > 3 / 10  <=>  10x > 3 * total
+            total_3 = 3 * (cjk + latin)
+            labels[i] = "zh" if cjk * 10 > total_3 else "en" if latin * 10 > total_3 else "other"
+    if use_cache:
+        for key, label in zip(keys, labels):
+            cache[key] = label
+            cache.move_to_end(key)
+        while len(cache) > _LANG_LABEL_CACHE_SIZE:
+            cache.popitem(last=False)
+    # 按样本顺序批量计数，键的插入顺序 (most_common 并列时的顺序) 不变
+    lang_counter.update(labels)
+
+
+async def _run_batch_check(
+    directory: str,
+    schema_path: Optional[str],
+    ruleset_name: str,
+    patterns: Optional[List[str]] = None,
+    sample_count: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> BatchCheckResult:
+    """批量检查目录，每个文件作为独立任务分发到进程池并行执行."""
+    dir_path = Path(directory)
+    result = BatchCheckResult(directory=str(dir_path))
+    if not dir_path.is_dir():
+        result.success = False
+        result.error = f"不是目录: {dir_path}"
+        return result
+
+    file_list = DataChecker.collect_files(dir_path, patterns)
+    result.total_files = len(file_list)
+    paths = [str(f) for f in file_list]
+    args = (schema_path, ruleset_name, sample_count, None)
+
+    outcomes: List[Any] = []
+    if (
+        max_workers == 1
+        or len(paths) < 2
+        or sum(os.path.getsize(p) for p in paths) < _OFFLOAD_MIN_BYTES
+    ):
+        for p in paths:
+            try:
+                outcomes.append(_check_worker(p, *args))
+            except Exception as e:
+                outcomes.append(e)
+    else:
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+        # max_workers 只限制同时提交到共享进程池的任务数，不另建进程池
+        limit = asyncio.Semaphore(max_workers or len(paths))
+
+        async def _submit(p: str) -> CheckResult:
+            async with limit:
+                return await loop.run_in_executor(executor, _check_worker, p, *args)
+
+        outcomes = await asyncio.gather(*(_submit(p) for p in paths), return_exceptions=True)
+
+    for file_path, outcome in zip(file_list, outcomes):
+        rel_path = str(file_path.relative_to(dir_path))
+        if isinstance(outcome, Exception):
+            result.skipped_files.append(f"{rel_path}: {outcome}")
+        else:
+            result.add_file_result(rel_path, outcome)
+    result.finalize()
+    return result
+
+
+def _text(text: str) -> "TextContent":
+    """构造文本回复; 字段已知合法，用 model_construct 跳过 pydantic 校验."""
+    return TextContent.model_construct(type="text", text=text)
+
+
+def _file_stat_key(path: str) -> tuple:
+    """返回 (st_mtime_ns, st_size) 作为缓存键的一部分."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _render_check_summary(result: CheckResult) -> str:
+    """生成 check_data_quality 的回复文本."""
+    if not result.success:
+        return f"检查失败: {result.error}"
+
+    # Generate summary
+    score = result.pass_rate * 100
+    if score >= 90:
+        grade = "🟢 优秀"
+    elif score >= 70:
+        grade = "🟡 良好"
+    elif score >= 50:
+        grade = "🟠 一般"
+    else:
+        grade = "🔴 需改进"
+
+    lines = [
+        "## 数据质量检查结果",
+        "",
+        "### 概要",
+        f"- 总样本: {result.total_samples}",
+        f"- 通过: {result.passed_samples}",
+        f"- 失败: {result.failed_samples}",
+        f"- **通过率: {result.pass_rate:.1%}**",
+        f"- **评级: {grade}**",
+        "",
+        "### 问题统计",
+        f"- 🔴 错误: {result.error_count}",
+        f"- 🟡 警告: {result.warning_count}",
+        f"- 🔵 提示: {result.info_count}",
+        "",
+    ]
+
+    if result.duplicates:
+        lines.extend(["### 重复检测", f"发现 {len(result.duplicates)} 组重复数据", ""])
+
+    if result.failed_sample_ids:
+        failed_line = ", ".join(result.failed_sample_ids[:10])
+        if result.failed_samples > 10:
+            failed_line += f" (还有 {result.failed_samples - 10} 个...)"
+        lines.extend(["### 失败样本", failed_line])
+
+    return "\n".join(lines)
+
+
+async def _handle_check_data_quality(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """检查数据文件质量，全量检查的回复文本按文件状态缓存."""
+    ruleset_name = arguments.get("ruleset", "default")
+    data_path = arguments["data_path"]
+    schema_path = arguments.get("schema_path")
+    sample_count = arguments.get("sample_count")
+    sample_rate = arguments.get("sample_rate")
+
+    if sample_count is None and sample_rate is None:
+        # 全量检查结果确定，可按文件 mtime+size 复用
+        cache_key = (
+            str(Path(data_path).resolve()),
+            _file_stat_key(data_path),
+            ruleset_name,
+            schema_path,
+            _file_stat_key(schema_path) if schema_path else (),
+        )
+        text = _CHECK_CACHE.get(cache_key)
+        if text is None:
+            result = await _run_check(data_path, schema_path, ruleset_name)
+            text = _CHECK_CACHE[cache_key] = _render_check_summary(result)
+            if len(_CHECK_CACHE) > _CHECK_CACHE_SIZE:
+                _CHECK_CACHE.popitem(last=False)
+        else:
+            _CHECK_CACHE.move_to_end(cache_key)
+        return [_text(text)]
+
+    result = await _run_check(data_path, schema_path, ruleset_name, sample_count, sample_rate)
+    return [_text(_render_check_summary(result))]
+
+
+async def _handle_validate_from_datarecipe(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """使用 DataRecipe 分析结果验证数据并保存报告."""
+    checker = DataChecker()
+    result = checker.check_from_datarecipe(
+        arguments["analysis_dir"],
+        arguments.get("data_path"),
+    )
+
+    if not result.success:
+        return [_text(f"验证失败: {result.error}")]
+
+    report = QualityReport(result, title="数据验证报告")
+
+    # Save report
+    output_dir = Path(arguments["analysis_dir"]) / "12_质检报告"
+    output_dir.mkdir(exist_ok=True)
+    output_path = output_dir / "quality_report.md"
+    report.save(str(output_path), "markdown")
+
+    # Return summary
+    score = result.pass_rate * 100
+    grade = (
+        "🟢 优秀"
+        if score >= 90
+        else "🟡 良好"
+        if score >= 70
+        else "🟠 一般"
+        if score >= 50
+        else "🔴 需改进"
+    )
+    dup_section = (
+        f"### 重复数据\n发现 {len(result.duplicates)} 组重复" if result.duplicates else ""
+    )
+
+    text = _VALIDATE_TEMPLATE.format_map({
+        "pass_rate": result.pass_rate,
+        "grade": grade,
+        "total_samples": result.total_samples,
+        "error_count": result.error_count,
+        "warning_count": result.warning_count,
+        "output_path": output_path,
+        "dup_section": dup_section,
+    })
+    return [_text(text)]
+
+
+async def _handle_compare_distributions(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """对比多个数据文件的分布."""
+    file_paths = arguments["file_paths"]
+
+    if len(file_paths) < 2:
+        return [_text("错误: 至少需要 2 个文件")]
+
+    # 只需要分布统计，不跑规则检查 / 去重 / 异常检测
+    checker = DataChecker()
+    distributions = []
+    for file_path in file_paths:
+        samples, _ = checker._load_data(Path(file_path))
+
+        distributions.append(
+            {
+                "file": Path(file_path).name,
+                "count": len(samples),
+                "dist": checker._compute_distribution(samples, {}),
+            }
+        )
+
+    # Build comparison
+    lines = ["## 数据分布对比", ""]
+    lines.append("| 文件 | 样本数 |")
+    lines.append("|------|--------|")
+    for d in distributions:
+        lines.append(f"| {d['file']} | {d['count']} |")
+
+    lines.extend(["", "### 字段统计", ""])
+
+    all_fields = set()
+    for d in distributions:
+        all_fields.update(d["dist"].get("fields", {}).keys())
+
+    for field in sorted(all_fields):
+        lines.append(f"**{field}**:")
+        for d in distributions:
+            field_data = d["dist"].get("fields", {}).get(field, {})
+            if "length_stats" in field_data:
+                stats = field_data["length_stats"]
+                lines.append(f"- {d['file']}: 长度 {stats['avg']:.0f} (avg)")
+
+    return [_text("\n".join(lines))]
+
+
+async def _handle_list_quality_rules(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """列出所有可用的质量检查规则."""
+    ruleset = RuleSet()
+    lines = ["## 可用质量检查规则", ""]
+
+    for rule in ruleset.rules.values():
+        status = "✓" if rule.enabled else "✗"
+        lines.append(f"- {status} **{rule.name}** {rule.severity.icon}")
+        lines.append(f"  - ID: `{rule.id}`")
+        lines.append(f"  - {rule.description}")
+        lines.append("")
+
+    lines.extend(
+        [
+            "## 预设规则集",
+            "- `default`: 通用规则",
+            "- `sft`: SFT 数据规则",
+            "- `preference`: 偏好数据规则",
+        ]
+    )
+
+    return [_text("\n".join(lines))]
+
+
+async def _handle_infer_schema(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """从数据文件推断 Schema."""
+    checker = DataChecker()
+    schema = checker.infer_schema_file(
+        arguments["data_path"],
+        arguments.get("output_path"),
+    )
+
+    fields = schema.get("fields", {})
+    field_count = len(fields)
+    required_count = sum(1 for f in fields.values() if f.get("required"))
+
+    lines = [
+        "## Schema 推断结果",
+        "",
+        f"- 样本数: {schema.get('sample_count', 0)}",
+        f"- 字段数: {field_count}",
+        f"- 必填字段: {required_count}",
+        "",
+        "### 字段详情",
+        "",
+        "| 字段 | 类型 | 必填 | 约束 |",
+        "|------|------|------|------|",
+    ]
+
+    for fname, fdef in fields.items():
+        ftype = fdef.get("type", "-")
+        req = "是" if fdef.get("required") else "否"
+        constraints = []
+        if "min_length" in fdef:
+            constraints.append(f"长度 {fdef['min_length']}-{fdef['max_length']}")
+        if "enum" in fdef:
+            constraints.append(f"枚举 {fdef['enum']}")
+        if "min_value" in fdef:
+            constraints.append(f"值 {fdef['min_value']}-{fdef['max_value']}")
+        lines.append(f"| {fname} | {ftype} | {req} | {', '.join(constraints) or '-'} |")
+
+    if arguments.get("output_path"):
+        lines.extend(["", f"Schema 已保存: {arguments['output_path']}"])
+
+    return [_text("\n".join(lines))]
+
+
+async def _handle_fix_data(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """修复数据文件常见质量问题."""
+    fixer = DataFixer()
+    result = fixer.fix_file(
+        arguments["data_path"],
+        arguments["output_path"],
+        strip_pii=arguments.get("strip_pii", False),
+    )
+
+    lines = [
+        "## 数据修复结果",
+        "",
+        f"- 输入样本: {result.total_input}",
+        f"- 输出样本: {result.total_output}",
+    ]
+    if result.duplicates_removed:
+        lines.append(f"- 去除重复: {result.duplicates_removed}")
+    if result.trimmed_count:
+        lines.append(f"- 修剪空白: {result.trimmed_count} 个字段")
+    if result.empty_removed:
+        lines.append(f"- 移除空样本: {result.empty_removed}")
+    if result.pii_redacted_count:
+        lines.append(f"- PII 脱敏: {result.pii_redacted_count} 个字段")
+    lines.extend(["", f"输出文件: {arguments['output_path']}"])
+
+    return [_text("\n".join(lines))]
+
+
+async def _handle_batch_check_directory(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """批量检查目录下所有数据文件."""
+    pat = arguments.get("pattern")
+    patterns = [p.strip() for p in pat.split(",")] if pat else None
+
+    batch_result = await _run_batch_check(
+        arguments["directory"],
+        arguments.get("schema_path"),
+        arguments.get("ruleset", "default"),
+        patterns=patterns,
+        sample_count=arguments.get("sample_count"),
+        max_workers=arguments.get("max_workers"),
+    )
+
+    lines = [
+        "## 批量数据质量检查结果",
+        "",
+        f"- 目录: `{batch_result.directory}`",
+        f"- 文件数: {batch_result.total_files}",
+        f"- 总样本: {batch_result.total_samples}",
+        f"- **总通过率: {batch_result.overall_pass_rate:.1%}**",
+        "",
+        "### 文件明细",
+        "",
+        "| 文件 | 样本数 | 通过率 | 错误 | 警告 |",
+        "|------|--------|--------|------|------|",
+    ]
+
+    for fp, fr in batch_result.file_results.items():
+        lines.append(
+            f"| {fp} | {fr.total_samples} | {fr.pass_rate:.1%} "
+            f"| {fr.error_count} | {fr.warning_count} |"
+        )
+
+    if batch_result.skipped_files:
+        lines.extend(["", f"### 跳过文件 ({len(batch_result.skipped_files)})"])
+        for s in batch_result.skipped_files:
+            lines.append(f"- {s}")
+
+    return [_text("\n".join(lines))]
+
+
+async def _handle_check_drift(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """检测两个数据文件之间的分布漂移."""
+    checker = DataChecker()
+    stream_a = checker.iter_data(Path(arguments["data_path_a"]))
+    stream_b = checker.iter_data(Path(arguments["data_path_b"]))
+    first_a = next(stream_a, None)
+    first_b = next(stream_b, None)
+    if first_a is None or first_b is None:
+        return [_text("错误: 数据文件为空")]
+
+    shared = sorted(set(first_a.keys()) & set(first_b.keys()))
+    requested = arguments.get("fields")
+    if requested:
+        shared = [f for f in requested if f in shared]
+    if not shared:
+        return [_text("错误: 两个文件没有共有字段")]
+
+    count_a, stats_a = _drift_field_stats(chain([first_a], stream_a), shared)
+    count_b, stats_b = _drift_field_stats(chain([first_b], stream_b), shared)
+
+    def _classify(fa: dict, fb: dict) -> str:
+        if fa["num_count"] + fb["num_count"] > (fa["present"] + fb["present"]) * 0.5:
+            return "numeric"
+        str_count = fa["str_count"] + fb["str_count"]
+        if not str_count:
+            return "text"
+        if fa["overflow"] or fb["overflow"]:
+            # 计数器已清空: 去重数下界已达 30% 时确定为文本，否则仍按类别报告
+            if max(fa["overflow_strs"], fb["overflow_strs"]) / str_count >= 0.3:
+                return "text"
+            return "categorical"
+        # 逐个累计两侧去重后的字符串数，超过 30% 即判为文本，不构建并集
+        strs_a = fa["strs"]
+        unique = len(strs_a)
+        if unique / str_count >= 0.3:
+            return "text"
+        for v in fb["strs"]:
+            if v not in strs_a:
+                unique += 1
+                if unique / str_count >= 0.3:
+                    return "text"
+        return "categorical"
+
+    lines = [
+        "## 分布漂移检测结果", "",
+        f"- 文件 A: `{Path(arguments['data_path_a']).name}` ({count_a} 条)",
+        f"- 文件 B: `{Path(arguments['data_path_b']).name}` ({count_b} 条)",
+        f"- 共有字段: {len(shared)}", "",
+    ]
+    drifted_fields: List[str] = []
+    for field in shared:
+        fa, fb = stats_a[field], stats_b[field]
+        ftype = _classify(fa, fb)
+        lines.append(f"### 字段: `{field}` (类型: {ftype})")
+        lines.append("")
+        if ftype == "numeric":
+            for label, fs in [("A", fa), ("B", fb)]:
+                if fs["num_count"]:
+                    avg = fs["num_sum"] / fs["num_count"]
+                    p25, p50, p75 = _percentiles(fs["nums"], [25, 50, 75])
+                    lines.append(
+                        f"- {label}: count={fs['num_count']}, mean={avg:.2f}, "
+                        f"min={fs['num_min']}, max={fs['num_max']}, "
+                        f"p25={p25:.2f}, p50={p50:.2f}, p75={p75:.2f}"
+                    )
+            if fa["num_count"] and fb["num_count"]:
+                ks = _ks_statistic(fa["nums"], fb["nums"])
+                drifted = ks > _DRIFT_KS_THRESHOLD
+                if drifted:
+                    drifted_fields.append(field)
+                lines.append(f"- KS 统计量: {ks:.3f} ({'**漂移**' if drifted else '稳定'})")
+        elif ftype == "categorical" and (fa["overflow"] or fb["overflow"]):
+            lines.append(
+                f"- 不同取值超过 {_DRIFT_MAX_DISTINCT} 个，未统计类别分布，未计算 TV 距离"
+            )
+        elif ftype == "categorical":
+            dist_a = fa["strs"] + fa["others"]
+            dist_b = fb["strs"] + fb["others"]
+            tv = _tv_distance(dist_a, dist_b)
+            drifted = tv > _DRIFT_TV_THRESHOLD
+            if drifted:
+                drifted_fields.append(field)
+            lines.append(f"- TV 距离: {tv:.3f} ({'**漂移**' if drifted else '稳定'})")
+            lines.append("")
+            all_cats = sorted(dist_a.keys() | dist_b.keys())
+            lines.append("| 类别 | A | B |")
+            lines.append("|------|---|---|")
             lines.extend(
-                [
-                    "## 预设规则集",
-                    "- `default`: 通用规则",
-                    "- `sft`: SFT 数据规则",
-                    "- `preference`: 偏好数据规则",
-                ]
+                f"| {cat} | {dist_a.get(cat, 0)} | {dist_b.get(cat, 0)} |" for cat in all_cats[:20]
             )
+        else:
+            for label, fs in [("A", fa), ("B", fb)]:
+                if fs["len_count"]:
+                    avg_len = fs["len_sum"] / fs["len_count"]
+                    lines.append(f"- {label}: count={fs['len_count']}, avg_len={avg_len:.0f}")
+        lines.append("")
+    if drifted_fields:
+        lines.append(f"**漂移字段 ({len(drifted_fields)}): {', '.join(drifted_fields)}**")
+    else:
+        lines.append("**未检测到明显漂移**")
+    return [_text("\n".join(lines))]
+
+
+async def _handle_check_leakage(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """检测训练集和测试集之间的数据泄漏."""
+    checker = DataChecker()
+    train_stream = checker.iter_data(Path(arguments["train_path"]))
+    test_stream = checker.iter_data(Path(arguments["test_path"]))
+    first_train = next(train_stream, None)
+    first_test = next(test_stream, None)
+    if first_train is None or first_test is None:
+        return [_text("错误: 数据文件为空")]
+
+    threshold = arguments.get("threshold", 0.9)
+    key_fields = arguments.get("key_fields")
+    if not key_fields:
+        sample = first_train
+        key_fields = [k for k, v in sample.items() if isinstance(v, str) and len(v) > 10]
+        if not key_fields:
+            key_fields = [k for k, v in sample.items() if isinstance(v, str)]
+    if not key_fields:
+        return [_text("错误: 未找到可比较的文本字段")]
+
+    # Stream train: exact keys + MinHash LSH index, samples are not retained
+    train_keys: Dict[Hashable, int] = {}
+    lsh = MinHashLSH(threshold=threshold)
+    train_sigs: List[DocSig] = []
+    # setdefault keeps the first index with a single hash lookup per sample
+    setdefault = train_keys.setdefault
+    for i, s in enumerate(chain([first_train], train_stream)):
+        sig = _doc_sig(s, key_fields)
+        setdefault(sig.key, i)
+        train_sigs.append(sig)
+        if sig.n:
+            lsh.insert(i, minhash_signature(sig.tokens, lsh.num_perm))
+
+    # Stream test: exact matches keep an empty token set so they are not
+    # re-counted as near duplicates
+    exact_dupes = []
+    test_sigs: List[DocSig] = []
+    for j, s in enumerate(chain([first_test], test_stream)):
+        sig = _doc_sig(s, key_fields)
+        i = train_keys.get(sig.key)
+        if i is not None:
+            exact_dupes.append((i, j))
+            sig = DocSig(sig.key, frozenset(), 0)
+        test_sigs.append(sig)
+
+    # Near-duplicate via MinHash LSH, confirmed with exact Jaccard.
+    # Large candidate lists are confirmed with packed bitsets (built on first need)
+    bitsets = None
+    bitsets_built = False
+
+    near_dupes = []
+    for j, test_sig in enumerate(test_sigs):
+        if not test_sig.n:
+            continue
+        candidates = sorted(lsh.query(minhash_signature(test_sig.tokens, lsh.num_perm)))
+
+        if len(candidates) >= _BITSET_MIN_CANDIDATES and not bitsets_built:
+            bitsets = TokenBitsets.build(
+                [sig.tokens for sig in train_sigs] + [sig.tokens for sig in test_sigs]
+            )
+            bitsets_built = True
+        if bitsets is not None and len(candidates) >= _BITSET_MIN_CANDIDATES:
+            sims = bitsets.jaccard(len(train_sigs) + j, candidates)
+            hits = ((sims >= threshold) & (sims < 1.0)).nonzero()[0]
+            if hits.size:
+                k = int(hits[0])
+                near_dupes.append((candidates[k], j, float(sims[k])))
+            continue
+
+        # union = |a| + |b| - |a & b|, so no union set is built per candidate
+        intersection = test_sig.tokens.intersection
+        n_test = test_sig.n
+        for i in candidates:
+            train_sig = train_sigs[i]
+            inter = len(intersection(train_sig.tokens))
+            sim = inter / (n_test + train_sig.n - inter)
+            if threshold <= sim < 1.0:
+                near_dupes.append((i, j, sim))
+                break
+
+    total = len(test_sigs)
+    exact_rate = len(exact_dupes) / total * 100 if total else 0
+    near_rate = len(near_dupes) / total * 100 if total else 0
+    total_rate = (len(exact_dupes) + len(near_dupes)) / total * 100 if total else 0
+
+    lines = [
+        "## 数据泄漏检测结果", "",
+        f"- 训练集: {len(train_sigs)} 条",
+        f"- 测试集: {len(test_sigs)} 条",
+        f"- 比较字段: {', '.join(key_fields)}",
+        f"- 完全重复: {len(exact_dupes)} 条 ({exact_rate:.2f}%)",
+        f"- 近似重复: {len(near_dupes)} 条 ({near_rate:.2f}%)",
+        f"- **总泄漏: {len(exact_dupes) + len(near_dupes)} 条 ({total_rate:.2f}%)**",
+    ]
+    return [_text("\n".join(lines))]
+
+
+async def _handle_check_bias(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """检测数据集偏差."""
+    checker = DataChecker()
+    stream = checker.iter_data(Path(arguments["data_path"]))
+    # 前 200 条用于字段自动检测，之后与剩余样本一起单次遍历
+    head = list(islice(stream, 200))
+    if not head:
+        return [_text("错误: 数据文件为空")]
+
+    label_field = arguments.get("label_field")
+    text_field = arguments.get("text_field")
+    dimensions = arguments.get("dimensions", ["all"])
+    if "all" in dimensions:
+        dimensions = ["category", "length", "language"]
+
+    if not label_field or not text_field:
+        sample = head[0]
+        for k, v in sample.items():
+            if not label_field and isinstance(v, str) and len(v) < 50:
+                unique_vals = set(s.get(k, "") for s in head)
+                if 2 <= len(unique_vals) <= 50:
+                    label_field = k
+            if not text_field and isinstance(v, str) and len(v) >= 50:
+                text_field = k
+
+    do_category = "category" in dimensions and label_field
+    do_length = "length" in dimensions and text_field
+    do_language = "language" in dimensions and text_field
+
+    count = 0
+    counter: Counter = Counter()
+    len_count = len_sum = len_sumsq = 0
+    len_min = len_max = None
+    lang_counter: Counter = Counter()
+    lang_texts: List[str] = []
+    lang_seen = 0  # 已分类的文本数; 超过缓存容量后的批次不再查缓存
+    label_buf: List[str] = []
+    for s in chain(head, stream):
+        count += 1
+        if do_category and label_field in s:
+            lb = s[label_field]
+            if lb is not None:
+                label_buf.append(str(lb))
+                if len(label_buf) >= _COUNT_BATCH_SIZE:
+                    counter.update(label_buf)
+                    label_buf.clear()
+        if not (do_length or do_language):
+            continue
+        text = s.get(text_field)
+        if not isinstance(text, str):
+            continue
+        if do_length:
+            n = len(text)
+            len_count += 1
+            len_sum += n
+            len_sumsq += n * n
+            if len_min is None or n < len_min:
+                len_min = n
+            if len_max is None or n > len_max:
+                len_max = n
+        if do_language and text:
+            lang_texts.append(text)
+            if len(lang_texts) >= _LANG_BATCH_SIZE:
+                _classify_languages(
+                    lang_texts, lang_counter, lang_seen < _LANG_LABEL_CACHE_SIZE
+                )
+                lang_seen += len(lang_texts)
+                lang_texts.clear()
+    counter.update(label_buf)
+    if lang_texts:
+        _classify_languages(lang_texts, lang_counter, lang_seen < _LANG_LABEL_CACHE_SIZE)
+
+    buf = io.StringIO()
+    w = buf.write
+    w("## 数据偏差检测结果\n\n")
+    w(f"- 文件: `{Path(arguments['data_path']).name}` ({count} 条)\n")
+    w(f"- 标签字段: `{label_field or '(未指定)'}`\n")
+    w(f"- 文本字段: `{text_field or '(未指定)'}`\n")
+
+    # 每个小节以空行开头
+    if counter:
+        # most_common(k) 用有界堆取前 k 项，无需对全部类别排序
+        top_cats = counter.most_common(30)
+        min_cnt = min(counter.values())
+        ratio = top_cats[0][1] / min_cnt if min_cnt > 0 else float("inf")
+        w("\n### 类别分布\n")
+        w(f"- 类别数: {len(counter)}, 不均衡比: {ratio:.1f}:1\n")
+        w("| 类别 | 数量 | 占比 |\n")
+        w("|------|------|------|\n")
+        pct = 100.0 / sum(counter.values())
+        for cat, cnt in top_cats:
+            w(_BIAS_CAT_ROW(cat, cnt, cnt * pct))
+
+    if len_count:
+        avg = len_sum / len_count
+        # 长度为整数，用精确的整数平方和求方差
+        std = math.sqrt((len_count * len_sumsq - len_sum * len_sum) / len_count ** 2)
+        w("\n### 文本长度分布\n")
+        w(f"- 平均: {avg:.0f}, 标准差: {std:.0f}, 范围: [{len_min}, {len_max}]\n")
+
+    if lang_counter:
+        w("\n### 语言分布\n")
+        pct = 100.0 / sum(lang_counter.values())
+        for lang, cnt in lang_counter.most_common():
+            w(_BIAS_LANG_ROW(lang, cnt, cnt * pct))
+
+    return [_text(buf.getvalue())]
+
+
+async def _handle_check_coverage(arguments: Dict[str, Any]) -> List["TextContent"]:
+    """检测数据集字段覆盖度."""
+    checker = DataChecker()
+    samples, _ = checker._load_data(Path(arguments["data_path"]))
+    sample_count = arguments.get("sample_count")
+    if sample_count and sample_count < len(samples):
+        import random
+        samples = random.sample(samples, sample_count)
+
+    if not samples:
+        return [_text("错误: 数据文件为空")]
+
+    # Analyze field coverage
+    all_fields: Dict[str, Dict[str, int]] = {}
+    for s in samples:
+        for field in s:
+            if field not in all_fields:
+                all_fields[field] = {"present": 0, "non_empty": 0, "unique_values": set()}
+            all_fields[field]["present"] += 1
+            val = s[field]
+            if val is not None and val != "" and val != []:
+                all_fields[field]["non_empty"] += 1
+                str_val = str(val)[:200]
+                if len(all_fields[field]["unique_values"]) < 10000:
+                    all_fields[field]["unique_values"].add(str_val)
+
+    total = len(samples)
+    lines = [
+        "## 数据覆盖度检测", "",
+        f"- 文件: `{Path(arguments['data_path']).name}`",
+        f"- 样本数: {total}",
+        f"- 字段数: {len(all_fields)}", "",
+        "| 字段 | 出现率 | 非空率 | 唯一值数 |",
+        "|------|--------|--------|----------|",
+    ]
+    lines.extend(
+        f"| {field} | {stats['present'] / total * 100:.1f}% "
+        f"| {stats['non_empty'] / total * 100:.1f}% | {len(stats['unique_values'])} |"
+        for field, stats in sorted(all_fields.items())
+    )
+
+    # Overall coverage
+    avg_presence = sum(s["present"] / total * 100 for s in all_fields.values()) / len(all_fields) if all_fields else 0
+    avg_non_empty = sum(s["non_empty"] / total * 100 for s in all_fields.values()) / len(all_fields) if all_fields else 0
+    lines.extend(["", f"**平均出现率: {avg_presence:.1f}%, 平均非空率: {avg_non_empty:.1f}%**"])
+
+    return [_text("\n".join(lines))]
+
+
+_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[List["TextContent"]]]] = {
+    "check_data_quality": _handle_check_data_quality,
+    "validate_from_datarecipe": _handle_validate_from_datarecipe,
+    "compare_distributions": _handle_compare_distributions,
+    "list_quality_rules": _handle_list_quality_rules,
+    "infer_schema": _handle_infer_schema,
+    "fix_data": _handle_fix_data,
+    "batch_check_directory": _handle_batch_check_directory,
+    "check_drift": _handle_check_drift,
+    "check_leakage": _handle_check_leakage,
+    "check_bias": _handle_check_bias,
+    "check_coverage": _handle_check_coverage,
+}
 
-            return [TextContent(type="text", text="\n".join(lines))]
 
-        elif name == "infer_schema":
-            checker = DataChecker()
-            schema = checker.infer_schema_file(
-                arguments["data_path"],
-                arguments.get("output_path"),
-            )
+def create_server() -> "Server":
+    """创建 MCP 服务器实例."""
+    if not HAS_MCP:
+        raise ImportError("MCP 未安装。请运行: pip install datacheck[mcp]")
 
-            fields = schema.get("fields", {})
-            field_count = len(fields)
-            required_count = sum(1 for f in fields.values() if f.get("required"))
-
-            lines = [
-                "## Schema 推断结果",
-                "",
-                f"- 样本数: {schema.get('sample_count', 0)}",
-                f"- 字段数: {field_count}",
-                f"- 必填字段: {required_count}",
-                "",
-                "### 字段详情",
-                "",
-                "| 字段 | 类型 | 必填 | 约束 |",
-                "|------|------|------|------|",
-            ]
-
-            for fname, fdef in fields.items():
-                ftype = fdef.get("type", "-")
-                req = "是" if fdef.get("required") else "否"
-                constraints = []
-                if "min_length" in fdef:
-                    constraints.append(f"长度 {fdef['min_length']}-{fdef['max_length']}")
-                if "enum" in fdef:
-                    constraints.append(f"枚举 {fdef['enum']}")
-                if "min_value" in fdef:
-                    constraints.append(f"值 {fdef['min_value']}-{fdef['max_value']}")
-                lines.append(f"| {fname} | {ftype} | {req} | {', '.join(constraints) or '-'} |")
-
-            if arguments.get("output_path"):
-                lines.extend(["", f"Schema 已保存: {arguments['output_path']}"])
-
-            return [TextContent(type="text", text="\n".join(lines))]
-
-        elif name == "fix_data":
-            fixer = DataFixer()
-            result = fixer.fix_file(
-                arguments["data_path"],
-                arguments["output_path"],
-                strip_pii=arguments.get("strip_pii", False),
-            )
+    server = Server("datacheck")
 
-            lines = [
-                "## 数据修复结果",
-                "",
-                f"- 输入样本: {result.total_input}",
-                f"- 输出样本: {result.total_output}",
-            ]
-            if result.duplicates_removed:
-                lines.append(f"- 去除重复: {result.duplicates_removed}")
-            if result.trimmed_count:
-                lines.append(f"- 修剪空白: {result.trimmed_count} 个字段")
-            if result.empty_removed:
-                lines.append(f"- 移除空样本: {result.empty_removed}")
-            if result.pii_redacted_count:
-                lines.append(f"- PII 脱敏: {result.pii_redacted_count} 个字段")
-            lines.extend(["", f"输出文件: {arguments['output_path']}"])
-
-            return [TextContent(type="text", text="\n".join(lines))]
-
-        elif name == "batch_check_directory":
-            ruleset_name = arguments.get("ruleset", "default")
-            if ruleset_name == "sft":
-                rules = get_sft_ruleset()
-            elif ruleset_name == "preference":
-                rules = get_preference_ruleset()
-            else:
-                rules = RuleSet()
+    @server.list_tools()
+    async def list_tools() -> List[Tool]:
+        """列出可用的工具."""
+        return list(_TOOLS)
 
-            checker = DataChecker(rules)
-            pat = arguments.get("pattern")
-            patterns = [p.strip() for p in pat.split(",")] if pat else None
+    # 有预编译校验器时跳过框架逐次调用的 jsonschema.validate
+    @server.call_tool(validate_input=not _ARG_VALIDATORS)
+    async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+        """调用工具."""
+        validate = _ARG_VALIDATORS.get(name)
+        if validate is not None:
+            try:
+                arguments = validate(arguments)
+            except fastjsonschema.JsonSchemaException as e:
+                # 抛出异常, 由框架包装为 isError=True 的结果 (与 jsonschema 校验失败一致)
+                raise ValueError(f"参数校验失败: {e.message}") from e
+
+        handler = _HANDLERS.get(name)
+        if handler is None:
+            return [_text(f"未知工具: {name}")]
+        return await handler(arguments)
 
-            batch_result = checker.check_directory(
-                arguments["directory"],
-                schema_path=arguments.get("schema_path"),
-                patterns=patterns,
-                sample_count=arguments.get("sample_count"),
-            )
+    return server
 
-            lines = [
-                "## 批量数据质量检查结果",
-                "",
-                f"- 目录: `{batch_result.directory}`",
-                f"- 文件数: {batch_result.total_files}",
-                f"- 总样本: {batch_result.total_samples}",
-                f"- **总通过率: {batch_result.overall_pass_rate:.1%}**",
-                "",
-                "### 文件明细",
-                "",
-                "| 文件 | 样本数 | 通过率 | 错误 | 警告 |",
-                "|------|--------|--------|------|------|",
-            ]
-
-            for fp, fr in batch_result.file_results.items():
-                lines.append(
-                    f"| {fp} | {fr.total_samples} | {fr.pass_rate:.1%} "
-                    f"| {fr.error_count} | {fr.warning_count} |"
-                )
 
-            if batch_result.skipped_files:
-                lines.extend(["", f"### 跳过文件 ({len(batch_result.skipped_files)})"])
-                for s in batch_result.skipped_files:
-                    lines.append(f"- {s}")
-
-            return [TextContent(type="text", text="\n".join(lines))]
-
-        elif name == "check_drift":
-            checker = DataChecker()
-            samples_a, _ = checker._load_data(Path(arguments["data_path_a"]))
-            samples_b, _ = checker._load_data(Path(arguments["data_path_b"]))
-            if not samples_a or not samples_b:
-                return [TextContent(type="text", text="错误: 数据文件为空")]
-
-            fields_a = set(samples_a[0].keys())
-            fields_b = set(samples_b[0].keys())
-            shared = sorted(fields_a & fields_b)
-            requested = arguments.get("fields")
-            if requested:
-                shared = [f for f in requested if f in shared]
-            if not shared:
-                return [TextContent(type="text", text="错误: 两个文件没有共有字段")]
-
-            def _classify(vals: list) -> str:
-                nums = [v for v in vals if isinstance(v, (int, float))]
-                if len(nums) > len(vals) * 0.5:
-                    return "numeric"
-                strs = [v for v in vals if isinstance(v, str)]
-                if strs:
-                    unique_ratio = len(set(strs)) / len(strs) if strs else 1
-                    if unique_ratio < 0.3:
-                        return "categorical"
-                    return "text"
-                return "text"
+# stdout 缓冲大小; 大于常见结果报告, 使一条响应只需一次 write(2)
+_STDOUT_BUFFER_SIZE = 1024 * 1024
 
-            lines = [
-                "## 分布漂移检测结果", "",
-                f"- 文件 A: `{Path(arguments['data_path_a']).name}` ({len(samples_a)} 条)",
-                f"- 文件 B: `{Path(arguments['data_path_b']).name}` ({len(samples_b)} 条)",
-                f"- 共有字段: {len(shared)}", "",
-            ]
-            for field in shared:
-                vals_a = [s.get(field) for s in samples_a if field in s]
-                vals_b = [s.get(field) for s in samples_b if field in s]
-                ftype = _classify(vals_a + vals_b)
-                lines.append(f"### 字段: `{field}` (类型: {ftype})")
-                lines.append("")
-                if ftype == "numeric":
-                    for label, vals in [("A", vals_a), ("B", vals_b)]:
-                        nums = [v for v in vals if isinstance(v, (int, float))]
-                        if nums:
-                            avg = sum(nums) / len(nums)
-                            lines.append(f"- {label}: count={len(nums)}, mean={avg:.2f}, min={min(nums)}, max={max(nums)}")
-                elif ftype == "categorical":
-                    dist_a = Counter(str(v) for v in vals_a)
-                    dist_b = Counter(str(v) for v in vals_b)
-                    all_cats = sorted(set(list(dist_a.keys()) + list(dist_b.keys())))
-                    lines.append("| 类别 | A | B |")
-                    lines.append("|------|---|---|")
-                    for cat in all_cats[:20]:
-                        lines.append(f"| {cat} | {dist_a.get(cat, 0)} | {dist_b.get(cat, 0)} |")
-                else:
-                    for label, vals in [("A", vals_a), ("B", vals_b)]:
-                        lengths = [len(str(v)) for v in vals if v]
-                        if lengths:
-                            avg_len = sum(lengths) / len(lengths)
-                            lines.append(f"- {label}: count={len(lengths)}, avg_len={avg_len:.0f}")
-                lines.append("")
-            return [TextContent(type="text", text="\n".join(lines))]
-
-        elif name == "check_leakage":
-            checker = DataChecker()
-            train_samples, _ = checker._load_data(Path(arguments["train_path"]))
-            test_samples, _ = checker._load_data(Path(arguments["test_path"]))
-            if not train_samples or not test_samples:
-                return [TextContent(type="text", text="错误: 数据文件为空")]
-
-            threshold = arguments.get("threshold", 0.9)
-            key_fields = arguments.get("key_fields")
-            if not key_fields:
-                sample = train_samples[0]
-                key_fields = [k for k, v in sample.items() if isinstance(v, str) and len(v) > 10]
-                if not key_fields:
-                    key_fields = [k for k, v in sample.items() if isinstance(v, str)]
-            if not key_fields:
-                return [TextContent(type="text", text="错误: 未找到可比较的文本字段")]
-
-            def _make_key(s: dict, fields: list) -> str:
-                return "|||".join(str(s.get(f, "")).strip() for f in fields)
-
-            train_keys: Dict[str, int] = {}
-            for i, s in enumerate(train_samples):
-                k = _make_key(s, key_fields)
-                if k not in train_keys:
-                    train_keys[k] = i
-
-            exact_dupes = []
-            for j, s in enumerate(test_samples):
-                k = _make_key(s, key_fields)
-                if k in train_keys:
-                    exact_dupes.append((train_keys[k], j))
-
-            # Near-duplicate via Jaccard
-            def _tokenize(text: str) -> set:
-                return set(text.lower().split())
-
-            train_tokens = []
-            for s in train_samples[:5000]:
-                combined = " ".join(str(s.get(f, "")) for f in key_fields)
-                train_tokens.append(_tokenize(combined))
-
-            exact_test_idx = set(j for _, j in exact_dupes)
-            near_dupes = []
-            for j in range(min(len(test_samples), 500)):
-                if j in exact_test_idx:
-                    continue
-                test_tok = _tokenize(" ".join(str(test_samples[j].get(f, "")) for f in key_fields))
-                if not test_tok:
-                    continue
-                for i in range(len(train_tokens)):
-                    inter = len(test_tok & train_tokens[i])
-                    union = len(test_tok | train_tokens[i])
-                    sim = inter / union if union else 0
-                    if threshold <= sim < 1.0:
-                        near_dupes.append((i, j, sim))
-                        break
-
-            total = len(test_samples)
-            exact_rate = len(exact_dupes) / total * 100 if total else 0
-            near_rate = len(near_dupes) / total * 100 if total else 0
-            total_rate = (len(exact_dupes) + len(near_dupes)) / total * 100 if total else 0
-
-            lines = [
-                "## 数据泄漏检测结果", "",
-                f"- 训练集: {len(train_samples)} 条",
-                f"- 测试集: {len(test_samples)} 条",
-                f"- 比较字段: {', '.join(key_fields)}",
-                f"- 完全重复: {len(exact_dupes)} 条 ({exact_rate:.2f}%)",
-                f"- 近似重复: {len(near_dupes)} 条 ({near_rate:.2f}%)",
-                f"- **总泄漏: {len(exact_dupes) + len(near_dupes)} 条 ({total_rate:.2f}%)**",
-            ]
-            return [TextContent(type="text", text="\n".join(lines))]
-
-        elif name == "check_bias":
-            checker = DataChecker()
-            samples, _ = checker._load_data(Path(arguments["data_path"]))
-            if not samples:
-                return [TextContent(type="text", text="错误: 数据文件为空")]
-
-            label_field = arguments.get("label_field")
-            text_field = arguments.get("text_field")
-            dimensions = arguments.get("dimensions", ["all"])
-            if "all" in dimensions:
-                dimensions = ["category", "length", "language"]
-
-            if not label_field or not text_field:
-                sample = samples[0]
-                for k, v in sample.items():
-                    if not label_field and isinstance(v, str) and len(v) < 50:
-                        unique_vals = set(s.get(k, "") for s in samples[:200])
-                        if 2 <= len(unique_vals) <= 50:
-                            label_field = k
-                    if not text_field and isinstance(v, str) and len(v) >= 50:
-                        text_field = k
-
-            lines = [
-                "## 数据偏差检测结果", "",
-                f"- 文件: `{Path(arguments['data_path']).name}` ({len(samples)} 条)",
-                f"- 标签字段: `{label_field or '(未指定)'}`",
-                f"- 文本字段: `{text_field or '(未指定)'}`", "",
-            ]
-
-            if "category" in dimensions and label_field:
-                labels = [s.get(label_field) for s in samples if label_field in s]
-                counter = Counter(str(lb) for lb in labels if lb is not None)
-                if counter:
-                    sorted_cats = counter.most_common()
-                    ratio = sorted_cats[0][1] / sorted_cats[-1][1] if sorted_cats[-1][1] > 0 else float("inf")
-                    lines.append("### 类别分布")
-                    lines.append(f"- 类别数: {len(counter)}, 不均衡比: {ratio:.1f}:1")
-                    lines.append("| 类别 | 数量 | 占比 |")
-                    lines.append("|------|------|------|")
-                    total = sum(counter.values())
-                    for cat, cnt in sorted_cats[:30]:
-                        lines.append(f"| {cat} | {cnt} | {cnt / total * 100:.1f}% |")
-                    lines.append("")
-
-            if "length" in dimensions and text_field:
-                lengths = [len(s.get(text_field, "")) for s in samples if isinstance(s.get(text_field), str)]
-                if lengths:
-                    avg = sum(lengths) / len(lengths)
-                    variance = sum((x - avg) ** 2 for x in lengths) / len(lengths)
-                    std = math.sqrt(variance)
-                    lines.append("### 文本长度分布")
-                    lines.append(f"- 平均: {avg:.0f}, 标准差: {std:.0f}, 范围: [{min(lengths)}, {max(lengths)}]")
-                    lines.append("")
-
-            if "language" in dimensions and text_field:
-                lang_counter: Counter = Counter()
-                for s in samples:
-                    text = s.get(text_field, "")
-                    if not isinstance(text, str) or not text:
-                        continue
-                    cjk = sum(1 for ch in text[:500] if "\u4e00" <= ch <= "\u9fff")
-                    latin = sum(1 for ch in text[:500] if "\u0041" <= ch <= "\u007a")
-                    total_c = cjk + latin or 1
-                    if cjk / total_c > 0.3:
-                        lang_counter["zh"] += 1
-                    elif latin / total_c > 0.3:
-                        lang_counter["en"] += 1
-                    else:
-                        lang_counter["other"] += 1
-                if lang_counter:
-                    lines.append("### 语言分布")
-                    total_l = sum(lang_counter.values())
-                    for lang, cnt in lang_counter.most_common():
-                        lines.append(f"- {lang}: {cnt} ({cnt / total_l * 100:.1f}%)")
-                    lines.append("")
-
-            return [TextContent(type="text", text="\n".join(lines))]
-
-        elif name == "check_coverage":
-            checker = DataChecker()
-            samples, _ = checker._load_data(Path(arguments["data_path"]))
-            sample_count = arguments.get("sample_count")
-            if sample_count and sample_count < len(samples):
-                import random
-                samples = random.sample(samples, sample_count)
-
-            if not samples:
-                return [TextContent(type="text", text="错误: 数据文件为空")]
-
-            # Analyze field coverage
-            all_fields: Dict[str, Dict[str, int]] = {}
-            for s in samples:
-                for field in s:
-                    if field not in all_fields:
-                        all_fields[field] = {"present": 0, "non_empty": 0, "unique_values": set()}
-                    all_fields[field]["present"] += 1
-                    val = s[field]
-                    if val is not None and val != "" and val != []:
-                        all_fields[field]["non_empty"] += 1
-                        str_val = str(val)[:200]
-                        if len(all_fields[field]["unique_values"]) < 10000:
-                            all_fields[field]["unique_values"].add(str_val)
-
-            total = len(samples)
-            lines = [
-                "## 数据覆盖度检测", "",
-                f"- 文件: `{Path(arguments['data_path']).name}`",
-                f"- 样本数: {total}",
-                f"- 字段数: {len(all_fields)}", "",
-                "| 字段 | 出现率 | 非空率 | 唯一值数 |",
-                "|------|--------|--------|----------|",
-            ]
-            for field, stats in sorted(all_fields.items()):
-                presence = stats["present"] / total * 100
-                non_empty = stats["non_empty"] / total * 100
-                unique = len(stats["unique_values"])
-                lines.append(f"| {field} | {presence:.1f}% | {non_empty:.1f}% | {unique} |")
-
-            # Overall coverage
-            avg_presence = sum(s["present"] / total * 100 for s in all_fields.values()) / len(all_fields) if all_fields else 0
-            avg_non_empty = sum(s["non_empty"] / total * 100 for s in all_fields.values()) / len(all_fields) if all_fields else 0
-            lines.extend(["", f"**平均出现率: {avg_presence:.1f}%, 平均非空率: {avg_non_empty:.1f}%**"])
-
-            return [TextContent(type="text", text="\n".join(lines))]
 
-        else:
-            return [TextContent(type="text", text=f"未知工具: {name}")]
+def _buffered_stdout():
+    """以大缓冲包装 stdout, 每条消息在 flush 时一次性写出.
 
-    return server
+    stdio_server 每条消息 write + flush; 默认 8KB 缓冲会把大结果拆成多次 write(2).
+    """
+    raw = io.FileIO(sys.stdout.fileno(), "wb", closefd=False)
+    buffered = io.BufferedWriter(raw, buffer_size=_STDOUT_BUFFER_SIZE)
+    return anyio.wrap_file(
+        io.TextIOWrapper(buffered, encoding="utf-8", write_through=False)
+    )
 
 
 async def serve():
@@ -840,15 +1419,22 @@ async def serve():
         raise ImportError("MCP 未安装。请运行: pip install datacheck[mcp]")
 
     server = create_server()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream)
+    try:
+        async with stdio_server(stdout=_buffered_stdout()) as (read_stream, write_stream):
+            await server.run(
+                read_stream, write_stream, server.create_initialization_options()
+            )
+    finally:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
 
 
 def main():
-    """主入口."""
-    import asyncio
-
-    asyncio.run(serve())
+    """主入口; 安装了 uvloop 时使用 libuv 事件循环."""
+    if HAS_UVLOOP:
+        uvloop.run(serve())
+    else:
+        asyncio.run(serve())
 
 
 if __name__ == "__main__":
@@ -1,503 +1,572 @@
 """Quality report generation."""
 
+import html
+import io
 import json
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List
 
 from datacheck.checker import BatchCheckResult, CheckResult
 
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Inline stylesheets for the HTML reports; __GRADE_COLOR__ is replaced per render
+_REPORT_CSS = """\
+  * { margin:0; padding:0; box-sizing:border-box; }
+  body { font-family:-apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,sans-serif; background:#f8fafc; color:#1e293b; padding:2rem; }
+  .container { max-width:900px; margin:0 auto; }
+  h1 { font-size:1.5rem; margin-bottom:0.5rem; }
+  .meta { color:#64748b; font-size:0.875rem; margin-bottom:1.5rem; }
+  .summary { display:grid; grid-template-columns:repeat(auto-fit,minmax(140px,1fr)); gap:1rem; margin-bottom:1.5rem; }
+  .card { background:#fff; border-radius:8px; padding:1rem; box-shadow:0 1px 3px rgba(0,0,0,.1); text-align:center; }
+  .card .value { font-size:1.5rem; font-weight:700; }
+  .card .label { font-size:0.75rem; color:#64748b; margin-top:0.25rem; }
+  .grade { color:__GRADE_COLOR__; }
+  .notice { background:#fffbeb; border-left:4px solid #f59e0b; padding:0.75rem 1rem; margin-bottom:1.5rem; border-radius:0 4px 4px 0; }
+  .section { background:#fff; border-radius:8px; padding:1.5rem; margin-bottom:1.5rem; box-shadow:0 1px 3px rgba(0,0,0,.1); }
+  .section h2 { font-size:1.1rem; margin-bottom:1rem; }
+  table { width:100%; border-collapse:collapse; font-size:0.875rem; }
+  th,td { padding:0.5rem 0.75rem; text-align:left; border-bottom:1px solid #e2e8f0; }
+  th { background:#f1f5f9; font-weight:600; }
+  .badge { padding:2px 8px; border-radius:10px; font-size:0.75rem; color:#fff; }
+  .badge.error { background:#ef4444; }
+  .badge.warning { background:#f59e0b; }
+  .badge.info { background:#3b82f6; }
+  .status { font-weight:600; }
+  .status.pass { color:#22c55e; }
+  .status.fail { color:#ef4444; }
+  .error { color:#ef4444; font-weight:600; }
+  .warning { color:#f59e0b; font-weight:600; }
+  .info { color:#3b82f6; }
+  .bar-bg { background:#e2e8f0; border-radius:4px; height:8px; width:100px; }
+  .bar-fill { background:#22c55e; border-radius:4px; height:8px; min-width:2px; }
+  ol { padding-left:1.5rem; }
+  li { margin-bottom:0.25rem; }
+  .footer { text-align:center; color:#94a3b8; font-size:0.75rem; margin-top:2rem; }
+"""
+
+_BATCH_CSS = """\
+  *{margin:0;padding:0;box-sizing:border-box}
+  body{font-family:-apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,sans-serif;background:#f8fafc;color:#1e293b;padding:2rem}
+  .container{max-width:960px;margin:0 auto}
+  h1{font-size:1.5rem;margin-bottom:.5rem}
+  .meta{color:#64748b;font-size:.875rem;margin-bottom:1.5rem}
+  .summary{display:grid;grid-template-columns:repeat(auto-fit,minmax(140px,1fr));gap:1rem;margin-bottom:1.5rem}
+  .card{background:#fff;border-radius:8px;padding:1rem;box-shadow:0 1px 3px rgba(0,0,0,.1);text-align:center}
+  .card .value{font-size:1.5rem;font-weight:700} .card .label{font-size:.75rem;color:#64748b;margin-top:.25rem}
+  .grade{color:__GRADE_COLOR__}
+  .section{background:#fff;border-radius:8px;padding:1.5rem;margin-bottom:1.5rem;box-shadow:0 1px 3px rgba(0,0,0,.1)}
+  .section h2{font-size:1.1rem;margin-bottom:1rem}
+  table{width:100%;border-collapse:collapse;font-size:.875rem}
+  th,td{padding:.5rem .75rem;text-align:left;border-bottom:1px solid #e2e8f0}
+  th{background:#f1f5f9;font-weight:600}
+  .status{font-weight:600} .status.pass{color:#22c55e} .status.fail{color:#ef4444}
+  ul{padding-left:1.5rem} li{margin-bottom:.25rem}
+  .footer{text-align:center;color:#94a3b8;font-size:.75rem;margin-top:2rem}
+"""
+
+
+# Page head shared by both HTML reports, up to and including the <h1> title
+_HTML_HEAD = """<!DOCTYPE html>
+<html lang="zh">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>{title}</title>
+<style>
+{css}</style>
+</head>
+<body>
+<div class="container">
+  <h1>{title}</h1>
+""".format
+
+
+def _write_json(data: Any, output_path: Path) -> None:
+    """Write data as indented UTF-8 JSON, with orjson when installed.
+
+    Data orjson rejects (e.g. integers wider than 64 bits) is written with the stdlib.
+    """
+    payload = None
+    if HAS_ORJSON:
+        try:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    if payload is None:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    output_path.write_bytes(payload)
+
+
+def _save_json(report: "QualityReport | BatchQualityReport", output_path: Path) -> None:
+    _write_json(report.to_json(), output_path)
+
+
+def _save_html(report: "QualityReport | BatchQualityReport", output_path: Path) -> None:
+    output_path.write_bytes(report.to_html().encode("utf-8"))
+
+
+def _save_markdown(report: "QualityReport | BatchQualityReport", output_path: Path) -> None:
+    output_path.write_bytes(report.to_markdown().encode("utf-8"))
+
+
+# save() format -> writer; any other format is saved as markdown
+_SAVERS = {"json": _save_json, "html": _save_html}
+
+# diff change markers, indexed by (new > old) - (new < old) + 1
+_ARROWS = ("↓", "=", "↑")
+
+# print_summary frame line
+_SEP = "=" * 50
 
-@dataclass
+_SEVERITY_ICONS = {"error": "🔴", "warning": "🟡", "info": "🔵"}
+
+# (grade_text, grade_color) for scores >= 90, >= 70, >= 50 and below
+_GRADES = (
+    ("🟢 优秀", "#22c55e"),
+    ("🟡 良好", "#eab308"),
+    ("🟠 一般", "#f97316"),
+    ("🔴 需改进", "#ef4444"),
+)
+
+
+def _grade(pass_rate: float):
+    """Return (grade_text, grade_color) for a pass rate."""
+    score = pass_rate * 100
+    # Count the thresholds missed; "not >=" keeps NaN in the lowest grade
+    return _GRADES[(not score >= 90) + (not score >= 70) + (not score >= 50)]
+
+
+def _escape(value: Any) -> str:
+    """HTML-escape a data value interpolated into an HTML report."""
+    return html.escape(str(value))
+
+
+def _numbered_group(i: int, group: List[str]) -> str:
+    return f"{i}. {', '.join(group)}\n"
+
+
+def _bullet(i: int, item: str) -> str:
+    return f"- {item}\n"
+
+
+def _write_top(
+    w: Callable[[str], Any],
+    items: List[Any],
+    limit: int,
+    line: Callable[[int, Any], str],
+    more: str,
+) -> None:
+    """Write line(i, item) for the first ``limit`` items, then ``more`` with the rest count."""
+    n = len(items)
+    w("".join(line(i, item) for i, item in enumerate(items[:limit], 1)))
+    if n > limit:
+        w(more.format(n - limit))
+
+
+@dataclass(slots=True)
 class QualityReport:
     """Generate human-readable quality reports."""
 
     result: CheckResult
     title: str = "数据质量报告"
 
+    # Generation time, shared by every format rendered from this report
+    _generated_at: datetime = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._generated_at = datetime.now()
+
     def to_markdown(self) -> str:
         """Generate markdown report."""
-        lines = [
-            f"# {self.title}",
-            "",
-            f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "",
-            "---",
-            "",
-            "## 概要",
-            "",
-            "| 指标 | 数值 |",
-            "|------|------|",
-            f"| 总样本数 | {self.result.total_samples} |",
-            f"| 通过样本 | {self.result.passed_samples} |",
-            f"| 失败样本 | {self.result.failed_samples} |",
-            f"| **通过率** | **{self.result.pass_rate:.1%}** |",
-            "",
-        ]
+        r = self.result
+        buf = io.StringIO()
+        w = buf.write
+        w(
+            f"# {self.title}\n"
+            "\n"
+            f"生成时间: {self._generated_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            "\n"
+            "---\n"
+            "\n"
+            "## 概要\n"
+            "\n"
+            "| 指标 | 数值 |\n"
+            "|------|------|\n"
+            f"| 总样本数 | {r.total_samples} |\n"
+            f"| 通过样本 | {r.passed_samples} |\n"
+            f"| 失败样本 | {r.failed_samples} |\n"
+            f"| **通过率** | **{r.pass_rate:.1%}** |\n"
+            "\n"
+        )
 
         # Sampling notice
-        if self.result.sampled:
-            lines.extend([
-                f"> **注意**: 本报告基于抽样检查 ({self.result.sampled_count}/{self.result.original_count} 样本)",
-                "",
-            ])
+        if r.sampled:
+            w(
+                f"> **注意**: 本报告基于抽样检查 ({r.sampled_count}/{r.original_count} 样本)\n"
+                "\n"
+            )
 
         # Quality score visualization
-        score = self.result.pass_rate * 100
-        if score >= 90:
-            grade = "🟢 优秀"
-        elif score >= 70:
-            grade = "🟡 良好"
-        elif score >= 50:
-            grade = "🟠 一般"
-        else:
-            grade = "🔴 需改进"
-
-        lines.extend(
-            [
-                f"### 质量评级: {grade} ({score:.0f}分)",
-                "",
-            ]
-        )
+        w(f"### 质量评级: {_grade(r.pass_rate)[0]} ({r.pass_rate * 100:.0f}分)\n\n")
 
         # Issue summary
-        if self.result.error_count or self.result.warning_count:
-            lines.extend(
-                [
-                    "### 问题统计",
-                    "",
-                    "| 级别 | 数量 |",
-                    "|------|------|",
-                    f"| 🔴 错误 | {self.result.error_count} |",
-                    f"| 🟡 警告 | {self.result.warning_count} |",
-                    f"| 🔵 提示 | {self.result.info_count} |",
-                    "",
-                ]
+        if r.error_count or r.warning_count:
+            w(
+                "### 问题统计\n"
+                "\n"
+                "| 级别 | 数量 |\n"
+                "|------|------|\n"
+                f"| 🔴 错误 | {r.error_count} |\n"
+                f"| 🟡 警告 | {r.warning_count} |\n"
+                f"| 🔵 提示 | {r.info_count} |\n"
+                "\n"
             )
 
         # Rule results
-        if self.result.rule_results:
-            lines.extend(
-                [
-                    "---",
-                    "",
-                    "## 规则检查详情",
-                    "",
-                ]
-            )
-
-            for rule_id, rule_data in self.result.rule_results.items():
-                severity = rule_data.get("severity", "warning")
-                icon = {"error": "🔴", "warning": "🟡", "info": "🔵"}.get(severity, "⚪")
-                status = "✅" if rule_data["failed"] == 0 else "❌"
+        if r.rule_results:
+            w("---\n\n## 规则检查详情\n\n")
 
-                lines.append(f"### {icon} {rule_data['name']} {status}")
-                lines.append("")
-                lines.append(f"- 通过: {rule_data['passed']}")
-                lines.append(f"- 失败: {rule_data['failed']}")
+            for rule_data in r.rule_results.values():
+                name, passed, failed, failed_samples = (
+                    rule_data["name"], rule_data["passed"], rule_data["failed"],
+                    rule_data["failed_samples"],
+                )
+                icon = _SEVERITY_ICONS.get(rule_data.get("severity", "warning"), "⚪")
+                status = "✅" if failed == 0 else "❌"
+
+                w(
+                    f"### {icon} {name} {status}\n"
+                    "\n"
+                    f"- 通过: {passed}\n"
+                    f"- 失败: {failed}\n"
+                )
 
-                if rule_data["failed_samples"]:
-                    lines.append(f"- 失败样本: {', '.join(rule_data['failed_samples'][:5])}")
-                    if len(rule_data["failed_samples"]) > 5:
-                        lines.append(f"  (还有 {len(rule_data['failed_samples']) - 5} 个...)")
+                n_failed = len(failed_samples)
+                if n_failed:
+                    w(f"- 失败样本: {', '.join(failed_samples[:5])}\n")
+                    if n_failed > 5:
+                        w(f"  (还有 {n_failed - 5} 个...)\n")
 
-                lines.append("")
+                w("\n")
 
         # Duplicates
-        if self.result.duplicates:
-            lines.extend(
-                [
-                    "---",
-                    "",
-                    "## 重复检测",
-                    "",
-                    f"发现 **{len(self.result.duplicates)}** 组重复数据:",
-                    "",
-                ]
+        n_dupes = len(r.duplicates)
+        if n_dupes:
+            w(
+                "---\n"
+                "\n"
+                "## 重复检测\n"
+                "\n"
+                f"发现 **{n_dupes}** 组重复数据:\n"
+                "\n"
             )
-
-            for i, dup_group in enumerate(self.result.duplicates[:10], 1):
-                lines.append(f"{i}. {', '.join(dup_group)}")
-
-            if len(self.result.duplicates) > 10:
-                lines.append(f"\n(还有 {len(self.result.duplicates) - 10} 组...)")
-
-            lines.append("")
+            _write_top(w, r.duplicates, 10, _numbered_group, "\n(还有 {} 组...)\n")
+            w("\n")
 
         # Near-duplicates
-        if self.result.near_duplicates:
-            lines.extend(
-                [
-                    "---",
-                    "",
-                    "## 近似重复检测",
-                    "",
-                    f"发现 **{len(self.result.near_duplicates)}** 组近似重复数据:",
-                    "",
-                ]
+        n_near = len(r.near_duplicates)
+        if n_near:
+            w(
+                "---\n"
+                "\n"
+                "## 近似重复检测\n"
+                "\n"
+                f"发现 **{n_near}** 组近似重复数据:\n"
+                "\n"
             )
-
-            for i, dup_group in enumerate(self.result.near_duplicates[:10], 1):
-                lines.append(f"{i}. {', '.join(dup_group)}")
-
-            if len(self.result.near_duplicates) > 10:
-                lines.append(f"\n(还有 {len(self.result.near_duplicates) - 10} 组...)")
-
-            lines.append("")
+            _write_top(w, r.near_duplicates, 10, _numbered_group, "\n(还有 {} 组...)\n")
+            w("\n")
 
         # Distribution
-        if self.result.distribution.get("fields"):
-            lines.extend(
-                [
-                    "---",
-                    "",
-                    "## 数据分布",
-                    "",
-                ]
-            )
+        fields = r.distribution.get("fields")
+        if fields:
+            w("---\n\n## 数据分布\n\n")
 
-            for field_name, field_stats in self.result.distribution["fields"].items():
-                lines.append(f"### {field_name}")
-                lines.append("")
+            for field_name, field_stats in fields.items():
+                w(f"### {field_name}\n\n")
 
                 if "length_stats" in field_stats:
                     stats = field_stats["length_stats"]
-                    lines.append(
-                        f"- 长度: 最小 {stats['min']}, 最大 {stats['max']}, 平均 {stats['avg']:.0f}"
-                    )
+                    w(f"- 长度: 最小 {stats['min']}, 最大 {stats['max']}, 平均 {stats['avg']:.0f}\n")
 
                 if "unique_ratio" in field_stats:
-                    lines.append(f"- 唯一值比例: {field_stats['unique_ratio']:.1%}")
+                    w(f"- 唯一值比例: {field_stats['unique_ratio']:.1%}\n")
 
-                if "value_distribution" in field_stats:
-                    lines.append("- 值分布:")
-                    for val, count in list(field_stats["value_distribution"].items())[:5]:
-                        lines.append(f"  - {val}: {count}")
+                value_dist = field_stats.get("value_distribution")
+                if value_dist is not None:
+                    w("- 值分布:\n")
+                    w("".join(
+                        f"  - {val}: {count}\n"
+                        for val, count in islice(value_dist.items(), 5)
+                    ))
 
-                lines.append("")
+                w("\n")
 
         # Anomaly detection
-        if self.result.anomalies:
+        if r.anomalies:
             total_anomalies = sum(
-                a["outlier_count"] for a in self.result.anomalies.values()
+                a["outlier_count"] for a in r.anomalies.values()
             )
-            lines.extend([
-                "---",
-                "",
-                "## 异常检测",
-                "",
-                f"发现 **{total_anomalies}** 个异常值:",
-                "",
-                "| 字段 | 类型 | 异常数 | 正常范围 | 方法 |",
-                "|------|------|--------|----------|------|",
-            ])
-            for field_name, info in self.result.anomalies.items():
+            w(
+                "---\n"
+                "\n"
+                "## 异常检测\n"
+                "\n"
+                f"发现 **{total_anomalies}** 个异常值:\n"
+                "\n"
+                "| 字段 | 类型 | 异常数 | 正常范围 | 方法 |\n"
+                "|------|------|--------|----------|------|\n"
+            )
+            for field_name, info in r.anomalies.items():
                 bounds = info["bounds"]
                 field_type = "数值" if info["field_type"] == "number" else "长度"
-                lines.append(
+                w(
                     f"| {field_name} | {field_type} | {info['outlier_count']} "
-                    f"| [{bounds['lower']}, {bounds['upper']}] | {info['method'].upper()} |"
+                    f"| [{bounds['lower']}, {bounds['upper']}] | {info['method'].upper()} |\n"
                 )
-            lines.append("")
+            w("\n")
 
         # Reference comparison
-        if "reference_comparison" in self.result.distribution:
-            comp = self.result.distribution["reference_comparison"]
-            lines.extend(
-                [
-                    "---",
-                    "",
-                    "## 与参考数据对比",
-                    "",
-                    f"样本数量: {comp['sample_count']} vs 参考: {comp['reference_count']}",
-                    "",
-                ]
+        comp = r.distribution.get("reference_comparison")
+        if comp is not None:
+            w(
+                "---\n"
+                "\n"
+                "## 与参考数据对比\n"
+                "\n"
+                f"样本数量: {comp['sample_count']} vs 参考: {comp['reference_count']}\n"
+                "\n"
             )
 
             for field_name, field_comp in comp.get("field_comparisons", {}).items():
                 if "length_comparison" in field_comp:
                     lc = field_comp["length_comparison"]
-                    lines.append(
-                        f"- **{field_name}** 平均长度: {lc['sample_avg']:.0f} vs {lc['reference_avg']:.0f} ({lc['diff_percent']:.1f}% 差异)"
+                    w(
+                        f"- **{field_name}** 平均长度: {lc['sample_avg']:.0f} vs {lc['reference_avg']:.0f} ({lc['diff_percent']:.1f}% 差异)\n"
                     )
 
-            lines.append("")
+            w("\n")
 
         # Failed samples
-        if self.result.failed_sample_ids:
-            lines.extend(
-                [
-                    "---",
-                    "",
-                    "## 失败样本列表",
-                    "",
-                    f"共 {len(self.result.failed_sample_ids)} 个样本未通过检查:",
-                    "",
-                ]
+        n_failed_ids = len(r.failed_sample_ids)
+        if n_failed_ids:
+            w(
+                "---\n"
+                "\n"
+                "## 失败样本列表\n"
+                "\n"
+                f"共 {n_failed_ids} 个样本未通过检查:\n"
+                "\n"
             )
+            _write_top(w, r.failed_sample_ids, 20, _bullet, "\n(还有 {} 个...)\n")
 
-            for sid in self.result.failed_sample_ids[:20]:
-                lines.append(f"- {sid}")
+        w("\n---\n\n> 报告由 DataCheck 自动生成")
+        return buf.getvalue()
 
-            if len(self.result.failed_sample_ids) > 20:
-                lines.append(f"\n(还有 {len(self.result.failed_sample_ids) - 20} 个...)")
+    def to_html(self) -> str:
+        """Generate self-contained HTML report with inline CSS."""
+        r = self.result
+        grade_text, grade_color = _grade(r.pass_rate)
+        grade = grade_text.split()[-1]
+        generated_at = self._generated_at.strftime("%Y-%m-%d %H:%M:%S")
+        css = _REPORT_CSS.replace("__GRADE_COLOR__", grade_color)
+        title = _escape(self.title)
 
-        lines.extend(
-            [
-                "",
-                "---",
-                "",
-                "> 报告由 DataCheck 自动生成",
-            ]
-        )
+        buf = io.StringIO()
+        w = buf.write
+        w(_HTML_HEAD(title=title, css=css))
+        w(f"""  <div class="meta">生成时间: {generated_at}</div>
 
-        return "\n".join(lines)
+  <div class="summary">
+    <div class="card"><div class="value">{r.total_samples}</div><div class="label">总样本</div></div>
+    <div class="card"><div class="value">{r.passed_samples}</div><div class="label">通过</div></div>
+    <div class="card"><div class="value">{r.failed_samples}</div><div class="label">失败</div></div>
+    <div class="card"><div class="value grade">{r.pass_rate:.1%}</div><div class="label">通过率</div></div>
+    <div class="card"><div class="value grade">{grade}</div><div class="label">评级</div></div>
+  </div>
 
-    def to_html(self) -> str:
-        """Generate self-contained HTML report with inline CSS."""
-        score = self.result.pass_rate * 100
-        if score >= 90:
-            grade, grade_color = "优秀", "#22c55e"
-        elif score >= 70:
-            grade, grade_color = "良好", "#eab308"
-        elif score >= 50:
-            grade, grade_color = "一般", "#f97316"
-        else:
-            grade, grade_color = "需改进", "#ef4444"
-
-        generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # Build sections
-        sampling_html = ""
-        if self.result.sampled:
-            sampling_html = (
-                f'<div class="notice">抽样检查: {self.result.sampled_count}'
-                f'/{self.result.original_count} 样本</div>'
+  """)
+
+        # Each section is written only when present, followed by its separator line
+        if r.sampled:
+            w(
+                f'<div class="notice">抽样检查: {r.sampled_count}'
+                f'/{r.original_count} 样本</div>'
             )
+        w("\n  ")
 
         # Issue summary
-        issues_html = ""
-        if self.result.error_count or self.result.warning_count:
-            issues_html = f"""
+        if r.error_count or r.warning_count:
+            w(f"""
             <div class="section">
                 <h2>问题统计</h2>
                 <table>
                     <tr><th>级别</th><th>数量</th></tr>
-                    <tr><td class="error">错误</td><td>{self.result.error_count}</td></tr>
-                    <tr><td class="warning">警告</td><td>{self.result.warning_count}</td></tr>
-                    <tr><td class="info">提示</td><td>{self.result.info_count}</td></tr>
+                    <tr><td class="error">错误</td><td>{r.error_count}</td></tr>
+                    <tr><td class="warning">警告</td><td>{r.warning_count}</td></tr>
+                    <tr><td class="info">提示</td><td>{r.info_count}</td></tr>
                 </table>
-            </div>"""
+            </div>""")
+        w("\n  ")
 
         # Rule results
-        rules_html = ""
-        if self.result.rule_results:
-            rows = ""
-            for rule_id, rd in self.result.rule_results.items():
-                severity_cls = rd.get("severity", "warning")
-                status = "PASS" if rd["failed"] == 0 else "FAIL"
-                status_cls = "pass" if rd["failed"] == 0 else "fail"
-                total = rd["passed"] + rd["failed"]
-                pct = rd["passed"] / total * 100 if total > 0 else 100
-                rows += f"""
+        if r.rule_results:
+            w("""
+            <div class="section">
+                <h2>规则检查详情</h2>
+                <table>
+                    <tr><th>级别</th><th>规则</th><th>通过/总数</th><th>通过率</th><th>状态</th></tr>
+                    """)
+            for rd in r.rule_results.values():
+                name, passed, failed = rd["name"], rd["passed"], rd["failed"]
+                severity_cls = _escape(rd.get("severity", "warning"))
+                status, status_cls = ("PASS", "pass") if failed == 0 else ("FAIL", "fail")
+                total = passed + failed
+                pct = passed / total * 100 if total > 0 else 100
+                w(f"""
                     <tr>
                         <td><span class="badge {severity_cls}">{severity_cls}</span></td>
-                        <td>{rd['name']}</td>
-                        <td>{rd['passed']}/{total}</td>
+                        <td>{_escape(name)}</td>
+                        <td>{passed}/{total}</td>
                         <td>
                             <div class="bar-bg">
                                 <div class="bar-fill" style="width:{pct:.0f}%"></div>
                             </div>
                         </td>
                         <td><span class="status {status_cls}">{status}</span></td>
-                    </tr>"""
-            rules_html = f"""
-            <div class="section">
-                <h2>规则检查详情</h2>
-                <table>
-                    <tr><th>级别</th><th>规则</th><th>通过/总数</th><th>通过率</th><th>状态</th></tr>
-                    {rows}
+                    </tr>""")
+            w("""
                 </table>
-            </div>"""
+            </div>""")
+        w("\n  ")
 
         # Duplicates
-        dupes_html = ""
-        if self.result.duplicates:
+        n_dupes = len(r.duplicates)
+        if n_dupes:
             items = "".join(
-                f"<li>{', '.join(g)}</li>"
-                for g in self.result.duplicates[:10]
-            )
-            more = (
-                f"<p>还有 {len(self.result.duplicates) - 10} 组...</p>"
-                if len(self.result.duplicates) > 10 else ""
+                f"<li>{_escape(', '.join(g))}</li>"
+                for g in r.duplicates[:10]
             )
-            dupes_html = f"""
+            more = f"<p>还有 {n_dupes - 10} 组...</p>" if n_dupes > 10 else ""
+            w(f"""
             <div class="section">
-                <h2>重复检测 ({len(self.result.duplicates)} 组)</h2>
+                <h2>重复检测 ({n_dupes} 组)</h2>
                 <ol>{items}</ol>{more}
-            </div>"""
+            </div>""")
+        w("\n  ")
 
         # Near-duplicates
-        near_dupes_html = ""
-        if self.result.near_duplicates:
+        if r.near_duplicates:
             items = "".join(
-                f"<li>{', '.join(g)}</li>"
-                for g in self.result.near_duplicates[:10]
+                f"<li>{_escape(', '.join(g))}</li>"
+                for g in r.near_duplicates[:10]
             )
-            near_dupes_html = f"""
+            w(f"""
             <div class="section">
-                <h2>近似重复 ({len(self.result.near_duplicates)} 组)</h2>
+                <h2>近似重复 ({len(r.near_duplicates)} 组)</h2>
                 <ol>{items}</ol>
-            </div>"""
+            </div>""")
+        w("\n  ")
 
         # Distribution
-        dist_html = ""
-        if self.result.distribution.get("fields"):
-            rows = ""
-            for fname, fs in self.result.distribution["fields"].items():
-                ftype = fs.get("type", "-")
+        fields = r.distribution.get("fields")
+        if fields:
+            w("""
+            <div class="section">
+                <h2>数据分布</h2>
+                <table>
+                    <tr><th>字段</th><th>类型</th><th>长度范围</th><th>唯一率</th><th>空值</th></tr>
+                    """)
+            for fname, fs in fields.items():
+                ftype = _escape(fs.get("type", "-"))
                 length_info = ""
                 if "length_stats" in fs:
                     s = fs["length_stats"]
                     length_info = f"{s['min']}-{s['max']} (avg {s['avg']:.0f})"
                 unique_info = f"{fs['unique_ratio']:.1%}" if "unique_ratio" in fs else "-"
                 null_info = str(fs.get("null_count", 0))
-                rows += f"""
+                w(f"""
                     <tr>
-                        <td>{fname}</td><td>{ftype}</td>
+                        <td>{_escape(fname)}</td><td>{ftype}</td>
                         <td>{length_info or '-'}</td>
                         <td>{unique_info}</td><td>{null_info}</td>
-                    </tr>"""
-            dist_html = f"""
-            <div class="section">
-                <h2>数据分布</h2>
-                <table>
-                    <tr><th>字段</th><th>类型</th><th>长度范围</th><th>唯一率</th><th>空值</th></tr>
-                    {rows}
+                    </tr>""")
+            w("""
                 </table>
-            </div>"""
+            </div>""")
+        w("\n  ")
 
         # Anomaly section
-        anomaly_html = ""
-        if self.result.anomalies:
+        if r.anomalies:
             total_anomalies = sum(
-                a["outlier_count"] for a in self.result.anomalies.values()
+                a["outlier_count"] for a in r.anomalies.values()
             )
-            anomaly_rows = ""
-            for fname, info in self.result.anomalies.items():
-                bounds = info["bounds"]
-                ftype = "数值" if info["field_type"] == "number" else "长度"
-                anomaly_rows += (
-                    f"<tr><td>{fname}</td><td>{ftype}</td>"
-                    f"<td>{info['outlier_count']}</td>"
-                    f"<td>[{bounds['lower']}, {bounds['upper']}]</td>"
-                    f"<td>{info['method'].upper()}</td></tr>"
-                )
-            anomaly_html = f"""
+            anomaly_rows = "".join(
+                f"<tr><td>{_escape(fname)}</td>"
+                f"<td>{'数值' if info['field_type'] == 'number' else '长度'}</td>"
+                f"<td>{info['outlier_count']}</td>"
+                f"<td>[{info['bounds']['lower']}, {info['bounds']['upper']}]</td>"
+                f"<td>{_escape(info['method'].upper())}</td></tr>"
+                for fname, info in r.anomalies.items()
+            )
+            w(f"""
             <div class="section">
                 <h2>异常检测 ({total_anomalies} 个异常值)</h2>
                 <table>
                     <tr><th>字段</th><th>类型</th><th>异常数</th><th>正常范围</th><th>方法</th></tr>
                     {anomaly_rows}
                 </table>
-            </div>"""
-
-        return f"""<!DOCTYPE html>
-<html lang="zh">
-<head>
-<meta charset="utf-8">
-<meta name="viewport" content="width=device-width,initial-scale=1">
-<title>{self.title}</title>
-<style>
-  * {{ margin:0; padding:0; box-sizing:border-box; }}
-  body {{ font-family:-apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,sans-serif; background:#f8fafc; color:#1e293b; padding:2rem; }}
-  .container {{ max-width:900px; margin:0 auto; }}
-  h1 {{ font-size:1.5rem; margin-bottom:0.5rem; }}
-  .meta {{ color:#64748b; font-size:0.875rem; margin-bottom:1.5rem; }}
-  .summary {{ display:grid; grid-template-columns:repeat(auto-fit,minmax(140px,1fr)); gap:1rem; margin-bottom:1.5rem; }}
-  .card {{ background:#fff; border-radius:8px; padding:1rem; box-shadow:0 1px 3px rgba(0,0,0,.1); text-align:center; }}
-  .card .value {{ font-size:1.5rem; font-weight:700; }}
-  .card .label {{ font-size:0.75rem; color:#64748b; margin-top:0.25rem; }}
-  .grade {{ color:{grade_color}; }}
-  .notice {{ background:#fffbeb; border-left:4px solid #f59e0b; padding:0.75rem 1rem; margin-bottom:1.5rem; border-radius:0 4px 4px 0; }}
-  .section {{ background:#fff; border-radius:8px; padding:1.5rem; margin-bottom:1.5rem; box-shadow:0 1px 3px rgba(0,0,0,.1); }}
-  .section h2 {{ font-size:1.1rem; margin-bottom:1rem; }}
-  table {{ width:100%; border-collapse:collapse; font-size:0.875rem; }}
-  th,td {{ padding:0.5rem 0.75rem; text-align:left; border-bottom:1px solid #e2e8f0; }}
-  th {{ background:#f1f5f9; font-weight:600; }}
-  .badge {{ padding:2px 8px; border-radius:10px; font-size:0.75rem; color:#fff; }}
-  .badge.error {{ background:#ef4444; }}
-  .badge.warning {{ background:#f59e0b; }}
-  .badge.info {{ background:#3b82f6; }}
-  .status {{ font-weight:600; }}
-  .status.pass {{ color:#22c55e; }}
-  .status.fail {{ color:#ef4444; }}
-  .error {{ color:#ef4444; font-weight:600; }}
-  .warning {{ color:#f59e0b; font-weight:600; }}
-  .info {{ color:#3b82f6; }}
-  .bar-bg {{ background:#e2e8f0; border-radius:4px; height:8px; width:100px; }}
-  .bar-fill {{ background:#22c55e; border-radius:4px; height:8px; min-width:2px; }}
-  ol {{ padding-left:1.5rem; }}
-  li {{ margin-bottom:0.25rem; }}
-  .footer {{ text-align:center; color:#94a3b8; font-size:0.75rem; margin-top:2rem; }}
-</style>
-</head>
-<body>
-<div class="container">
-  <h1>{self.title}</h1>
-  <div class="meta">生成时间: {generated_at}</div>
-
-  <div class="summary">
-    <div class="card"><div class="value">{self.result.total_samples}</div><div class="label">总样本</div></div>
-    <div class="card"><div class="value">{self.result.passed_samples}</div><div class="label">通过</div></div>
-    <div class="card"><div class="value">{self.result.failed_samples}</div><div class="label">失败</div></div>
-    <div class="card"><div class="value grade">{self.result.pass_rate:.1%}</div><div class="label">通过率</div></div>
-    <div class="card"><div class="value grade">{grade}</div><div class="label">评级</div></div>
-  </div>
+            </div>""")
 
-  {sampling_html}
-  {issues_html}
-  {rules_html}
-  {dupes_html}
-  {near_dupes_html}
-  {dist_html}
-  {anomaly_html}
+        w("""
 
   <div class="footer">报告由 DataCheck 自动生成</div>
 </div>
 </body>
-</html>"""
+</html>""")
+        return buf.getvalue()
 
     def to_json(self) -> Dict[str, Any]:
         """Generate JSON report."""
+        r = self.result
         summary = {
-            "total_samples": self.result.total_samples,
-            "passed_samples": self.result.passed_samples,
-            "failed_samples": self.result.failed_samples,
-            "pass_rate": self.result.pass_rate,
-            "error_count": self.result.error_count,
-            "warning_count": self.result.warning_count,
-            "info_count": self.result.info_count,
+            "total_samples": r.total_samples,
+            "passed_samples": r.passed_samples,
+            "failed_samples": r.failed_samples,
+            "pass_rate": r.pass_rate,
+            "error_count": r.error_count,
+            "warning_count": r.warning_count,
+            "info_count": r.info_count,
         }
 
-        if self.result.sampled:
+        if r.sampled:
             summary["sampling"] = {
                 "enabled": True,
-                "sampled_count": self.result.sampled_count,
-                "original_count": self.result.original_count,
+                "sampled_count": r.sampled_count,
+                "original_count": r.original_count,
             }
 
         return {
             "title": self.title,
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": self._generated_at.isoformat(),
             "summary": summary,
-            "rule_results": self.result.rule_results,
-            "duplicates": self.result.duplicates,
-            "near_duplicates": self.result.near_duplicates,
-            "distribution": self.result.distribution,
-            "anomalies": self.result.anomalies,
-            "failed_sample_ids": self.result.failed_sample_ids,
+            "rule_results": r.rule_results,
+            "duplicates": r.duplicates,
+            "near_duplicates": r.near_duplicates,
+            "distribution": r.distribution,
+            "anomalies": r.anomalies,
+            "failed_sample_ids": r.failed_sample_ids,
         }
 
     def save(self, output_path: str, format: str = "markdown"):
@@ -509,38 +578,24 @@ class QualityReport:
         """
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        if format == "json":
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(self.to_json(), f, indent=2, ensure_ascii=False)
-        elif format == "html":
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(self.to_html())
-        else:
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(self.to_markdown())
+        _SAVERS.get(format, _save_markdown)(self, output_path)
 
     def print_summary(self):
         """Print summary to console."""
-        score = self.result.pass_rate * 100
-        if score >= 90:
-            grade = "🟢 优秀"
-        elif score >= 70:
-            grade = "🟡 良好"
-        elif score >= 50:
-            grade = "🟠 一般"
-        else:
-            grade = "🔴 需改进"
-
-        print(f"\n{'=' * 50}")
-        print("  数据质量检查结果")
-        print(f"{'=' * 50}")
-        print(f"  总样本: {self.result.total_samples}")
-        print(f"  通过: {self.result.passed_samples}")
-        print(f"  失败: {self.result.failed_samples}")
-        print(f"  通过率: {self.result.pass_rate:.1%}")
-        print(f"  评级: {grade}")
-        print(f"{'=' * 50}\n")
+        r = self.result
+        grade = _grade(r.pass_rate)[0]
+
+        sys.stdout.write(
+            f"\n{_SEP}\n"
+            "  数据质量检查结果\n"
+            f"{_SEP}\n"
+            f"  总样本: {r.total_samples}\n"
+            f"  通过: {r.passed_samples}\n"
+            f"  失败: {r.failed_samples}\n"
+            f"  通过率: {r.pass_rate:.1%}\n"
+            f"  评级: {grade}\n"
+            f"{_SEP}\n\n"
+        )
 
     @staticmethod
     def diff(report_a: Dict[str, Any], report_b: Dict[str, Any]) -> str:
@@ -553,13 +608,6 @@ class QualityReport:
         Returns:
             Markdown formatted comparison
         """
-        def _arrow(old, new):
-            if new > old:
-                return "↑"
-            elif new < old:
-                return "↓"
-            return "="
-
         def _fmt_pct(val):
             if isinstance(val, (int, float)):
                 return f"{val:.1%}" if val <= 1 else f"{val}"
@@ -589,16 +637,16 @@ class QualityReport:
             ("警告数", "warning_count", str),
         ]
 
+        get_a, get_b = sa.get, sb.get
         for label, key, fmt in metrics:
-            va = sa.get(key, 0)
-            vb = sb.get(key, 0)
-            arrow = _arrow(va, vb)
-            lines.append(f"| {label} | {fmt(va)} | {fmt(vb)} | {arrow} |")
+            va = get_a(key, 0)
+            vb = get_b(key, 0)
+            lines.append(f"| {label} | {fmt(va)} | {fmt(vb)} | {_ARROWS[(vb > va) - (vb < va) + 1]} |")
 
         # Rule comparison
         rules_a = report_a.get("rule_results", {})
         rules_b = report_b.get("rule_results", {})
-        all_rules = sorted(set(rules_a.keys()) | set(rules_b.keys()))
+        all_rules = sorted({*rules_a, *rules_b})
 
         if all_rules:
             lines.extend([
@@ -615,8 +663,7 @@ class QualityReport:
                 name = rb.get("name", ra.get("name", rid))
                 fa = ra.get("failed", 0)
                 fb = rb.get("failed", 0)
-                arrow = _arrow(fa, fb)
-                lines.append(f"| {name} | {fa} | {fb} | {arrow} |")
+                lines.append(f"| {name} | {fa} | {fb} | {_ARROWS[(fb > fa) - (fb < fa) + 1]} |")
 
         # Duplicates comparison
         dupes_a = len(report_a.get("duplicates", []))
@@ -627,136 +674,101 @@ class QualityReport:
                 "## 重复数据",
                 "",
                 f"- A: {dupes_a} 组",
-                f"- B: {dupes_b} 组 {_arrow(dupes_a, dupes_b)}",
+                f"- B: {dupes_b} 组 {_ARROWS[(dupes_b > dupes_a) - (dupes_b < dupes_a) + 1]}",
             ])
 
         return "\n".join(lines)
 
 
-def _grade(pass_rate: float):
-    """Return (grade_text, grade_color) for a pass rate."""
-    score = pass_rate * 100
-    if score >= 90:
-        return "🟢 优秀", "#22c55e"
-    elif score >= 70:
-        return "🟡 良好", "#eab308"
-    elif score >= 50:
-        return "🟠 一般", "#f97316"
-    return "🔴 需改进", "#ef4444"
-
-
-@dataclass
+@dataclass(slots=True)
 class BatchQualityReport:
     """Generate quality reports for batch directory checks."""
 
     result: BatchCheckResult
     title: str = "批量数据质量报告"
 
+    # Generation time, shared by every format rendered from this report
+    _generated_at: datetime = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._generated_at = datetime.now()
+
     def to_markdown(self) -> str:
         """Generate markdown report."""
         r = self.result
-        grade_text, _ = _grade(r.overall_pass_rate)
-
-        lines = [
-            f"# {self.title}",
-            "",
-            f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"目录: `{r.directory}`",
-            "",
-            "---",
-            "",
-            "## 汇总",
-            "",
-            "| 指标 | 数值 |",
-            "|------|------|",
-            f"| 检查文件数 | {r.total_files} |",
-            f"| 总样本数 | {r.total_samples} |",
-            f"| 通过样本 | {r.total_passed_samples} |",
-            f"| 失败样本 | {r.total_failed_samples} |",
-            f"| **总通过率** | **{r.overall_pass_rate:.1%}** |",
-            "",
-            f"### 质量评级: {grade_text} ({r.overall_pass_rate * 100:.0f}分)",
-            "",
-        ]
+        grade_text = _grade(r.overall_pass_rate)[0]
+
+        buf = io.StringIO()
+        w = buf.write
+        w(
+            f"# {self.title}\n"
+            "\n"
+            f"生成时间: {self._generated_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"目录: `{r.directory}`\n"
+            "\n"
+            "---\n"
+            "\n"
+            "## 汇总\n"
+            "\n"
+            "| 指标 | 数值 |\n"
+            "|------|------|\n"
+            f"| 检查文件数 | {r.total_files} |\n"
+            f"| 总样本数 | {r.total_samples} |\n"
+            f"| 通过样本 | {r.total_passed_samples} |\n"
+            f"| 失败样本 | {r.total_failed_samples} |\n"
+            f"| **总通过率** | **{r.overall_pass_rate:.1%}** |\n"
+            "\n"
+            f"### 质量评级: {grade_text} ({r.overall_pass_rate * 100:.0f}分)\n"
+            "\n"
+        )
 
         if r.file_results:
-            lines.extend([
-                "---",
-                "",
-                "## 文件明细",
-                "",
-                "| 文件 | 样本数 | 通过率 | 错误 | 警告 | 状态 |",
-                "|------|--------|--------|------|------|------|",
-            ])
-            for path, fr in r.file_results.items():
-                status = "✅" if fr.error_count == 0 else "❌"
-                lines.append(
-                    f"| {path} | {fr.total_samples} | {fr.pass_rate:.1%} "
-                    f"| {fr.error_count} | {fr.warning_count} | {status} |"
-                )
-            lines.append("")
+            w(
+                "---\n"
+                "\n"
+                "## 文件明细\n"
+                "\n"
+                "| 文件 | 样本数 | 通过率 | 错误 | 警告 | 状态 |\n"
+                "|------|--------|--------|------|------|------|\n"
+            )
+            w("".join(
+                f"| {path} | {fr.total_samples} | {fr.pass_rate:.1%} "
+                f"| {fr.error_count} | {fr.warning_count} | {'✅' if fr.error_count == 0 else '❌'} |\n"
+                for path, fr in r.file_results.items()
+            ))
+            w("\n")
 
         if r.skipped_files:
-            lines.extend(["---", "", "## 跳过文件", ""])
-            for s in r.skipped_files:
-                lines.append(f"- {s}")
-            lines.append("")
+            w("---\n\n## 跳过文件\n\n")
+            w("".join(f"- {s}\n" for s in r.skipped_files))
+            w("\n")
 
-        lines.extend(["", "---", "", "> 报告由 DataCheck 自动生成"])
-        return "\n".join(lines)
+        w("\n---\n\n> 报告由 DataCheck 自动生成")
+        return buf.getvalue()
 
     def to_html(self) -> str:
         """Generate self-contained HTML report."""
         r = self.result
         grade_text, grade_color = _grade(r.overall_pass_rate)
-        generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        file_rows = ""
-        for path, fr in r.file_results.items():
-            status = "PASS" if fr.error_count == 0 else "FAIL"
-            status_cls = "pass" if fr.error_count == 0 else "fail"
-            file_rows += (
-                f"<tr><td>{path}</td><td>{fr.total_samples}</td>"
-                f"<td>{fr.pass_rate:.1%}</td><td>{fr.error_count}</td>"
-                f"<td>{fr.warning_count}</td>"
-                f'<td><span class="status {status_cls}">{status}</span></td></tr>'
-            )
+        generated_at = self._generated_at.strftime("%Y-%m-%d %H:%M:%S")
+        css = _BATCH_CSS.replace("__GRADE_COLOR__", grade_color)
+        title = _escape(self.title)
+
+        file_rows = "".join(
+            f"<tr><td>{_escape(path)}</td><td>{fr.total_samples}</td>"
+            f"<td>{fr.pass_rate:.1%}</td><td>{fr.error_count}</td>"
+            f"<td>{fr.warning_count}</td>"
+            f'<td><span class="status {"pass" if fr.error_count == 0 else "fail"}">'
+            f'{"PASS" if fr.error_count == 0 else "FAIL"}</span></td></tr>'
+            for path, fr in r.file_results.items()
+        )
 
         skipped_html = ""
         if r.skipped_files:
-            items = "".join(f"<li>{s}</li>" for s in r.skipped_files)
+            items = "".join(f"<li>{_escape(s)}</li>" for s in r.skipped_files)
             skipped_html = f'<div class="section"><h2>跳过文件 ({len(r.skipped_files)})</h2><ul>{items}</ul></div>'
 
-        return f"""<!DOCTYPE html>
-<html lang="zh">
-<head>
-<meta charset="utf-8">
-<meta name="viewport" content="width=device-width,initial-scale=1">
-<title>{self.title}</title>
-<style>
-  *{{margin:0;padding:0;box-sizing:border-box}}
-  body{{font-family:-apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,sans-serif;background:#f8fafc;color:#1e293b;padding:2rem}}
-  .container{{max-width:960px;margin:0 auto}}
-  h1{{font-size:1.5rem;margin-bottom:.5rem}}
-  .meta{{color:#64748b;font-size:.875rem;margin-bottom:1.5rem}}
-  .summary{{display:grid;grid-template-columns:repeat(auto-fit,minmax(140px,1fr));gap:1rem;margin-bottom:1.5rem}}
-  .card{{background:#fff;border-radius:8px;padding:1rem;box-shadow:0 1px 3px rgba(0,0,0,.1);text-align:center}}
-  .card .value{{font-size:1.5rem;font-weight:700}} .card .label{{font-size:.75rem;color:#64748b;margin-top:.25rem}}
-  .grade{{color:{grade_color}}}
-  .section{{background:#fff;border-radius:8px;padding:1.5rem;margin-bottom:1.5rem;box-shadow:0 1px 3px rgba(0,0,0,.1)}}
-  .section h2{{font-size:1.1rem;margin-bottom:1rem}}
-  table{{width:100%;border-collapse:collapse;font-size:.875rem}}
-  th,td{{padding:.5rem .75rem;text-align:left;border-bottom:1px solid #e2e8f0}}
-  th{{background:#f1f5f9;font-weight:600}}
-  .status{{font-weight:600}} .status.pass{{color:#22c55e}} .status.fail{{color:#ef4444}}
-  ul{{padding-left:1.5rem}} li{{margin-bottom:.25rem}}
-  .footer{{text-align:center;color:#94a3b8;font-size:.75rem;margin-top:2rem}}
-</style>
-</head>
-<body>
-<div class="container">
-  <h1>{self.title}</h1>
-  <div class="meta">生成时间: {generated_at} &middot; 目录: {r.directory}</div>
+        return _HTML_HEAD(title=title, css=css) + f"""  <div class="meta">生成时间: {generated_at} &middot; 目录: {_escape(r.directory)}</div>
   <div class="summary">
     <div class="card"><div class="value">{r.total_files}</div><div class="label">文件数</div></div>
     <div class="card"><div class="value">{r.total_samples}</div><div class="label">总样本</div></div>
@@ -797,7 +809,7 @@ class BatchQualityReport:
             }
         return {
             "title": self.title,
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": self._generated_at.isoformat(),
             "aggregate": {
                 "total_files": r.total_files,
                 "passed_files": r.passed_files,
@@ -817,27 +829,21 @@ class BatchQualityReport:
         """Save report to file."""
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        if format == "json":
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(self.to_json(), f, indent=2, ensure_ascii=False)
-        elif format == "html":
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(self.to_html())
-        else:
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(self.to_markdown())
+        _SAVERS.get(format, _save_markdown)(self, output_path)
 
     def print_summary(self):
         """Print summary to console."""
         r = self.result
-        grade_text, _ = _grade(r.overall_pass_rate)
-        print(f"\n{'=' * 50}")
-        print("  批量数据质量检查结果")
-        print(f"{'=' * 50}")
-        print(f"  文件数: {r.total_files}")
-        print(f"  总样本: {r.total_samples}")
-        print(f"  通过: {r.total_passed_samples}")
-        print(f"  失败: {r.total_failed_samples}")
-        print(f"  通过率: {r.overall_pass_rate:.1%}")
-        print(f"  评级: {grade_text}")
-        print(f"{'=' * 50}\n")
+        grade_text = _grade(r.overall_pass_rate)[0]
+        sys.stdout.write(
+            f"\n{_SEP}\n"
+            "  批量数据质量检查结果\n"
+            f"{_SEP}\n"
+            f"  文件数: {r.total_files}\n"
+            f"  总样本: {r.total_samples}\n"
+            f"  通过: {r.total_passed_samples}\n"
+            f"  失败: {r.total_failed_samples}\n"
+            f"  通过率: {r.overall_pass_rate:.1%}\n"
+            f"  评级: {grade_text}\n"
+            f"{_SEP}\n\n"
+        )
@@ -1,9 +1,12 @@
 """Quality check rules."""
 
+import copy
 import re
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 class Severity(Enum):
@@ -14,6 +17,12 @@ class Severity(Enum):
     INFO = "info"  # Nice to fix
 
 
+# Display icon per level, stored on the members so callers use `severity.icon`
+Severity.ERROR.icon = "🔴"
+Severity.WARNING.icon = "🟡"
+Severity.INFO.icon = "🔵"
+
+
 @dataclass
 class RuleResult:
     """Result of a single rule check."""
@@ -96,6 +105,101 @@ def _eval_condition(val, operator, target):
     return ops.get(operator, False)
 
 
+_CONFIG_CACHE_SIZE = 100
+# Resolved config path -> (mtime_ns, size, parsed YAML), least recently used first
+_CONFIG_CACHE: "OrderedDict[str, Tuple[int, int, Dict[str, Any]]]" = OrderedDict()
+
+
+# Config check builders: (field_name, rule_def) -> check_fn. Settings are bound
+# as default arguments so the per-sample call only does local lookups.
+
+
+def _config_required(field_name: str, rule_def: dict):
+    def _check(sample, schema, _fn=field_name):
+        return _fn in sample.get("data", sample)
+    return _check
+
+
+def _config_non_empty(field_name: str, rule_def: dict):
+    def _check(sample, schema, _fn=field_name):
+        val = sample.get("data", sample).get(_fn)
+        if val is None:
+            return False
+        return not (isinstance(val, str) and not val.strip())
+    return _check
+
+
+def _config_min_length(field_name: str, rule_def: dict):
+    def _check(sample, schema, _fn=field_name, _min=rule_def.get("value", 1)):
+        return len(sample.get("data", sample).get(_fn, "")) >= _min
+    return _check
+
+
+def _config_max_length(field_name: str, rule_def: dict):
+    def _check(sample, schema, _fn=field_name, _max=rule_def.get("value", 100000)):
+        return len(sample.get("data", sample).get(_fn, "")) <= _max
+    return _check
+
+
+def _config_regex(field_name: str, rule_def: dict):
+    # Compiled once when the rule is built; the check closes over the bound search
+    search = re.compile(rule_def.get("pattern", ".*")).search
+
+    def _check(sample, schema, _fn=field_name, _search=search):
+        return _search(sample.get("data", sample).get(_fn, "")) is not None
+    return _check
+
+
+def _config_enum(field_name: str, rule_def: dict):
+    def _check(sample, schema, _fn=field_name, _allowed=set(rule_def.get("values", []))):
+        return sample.get("data", sample).get(_fn) in _allowed
+    return _check
+
+
+def _config_conditional_required(field_name: str, rule_def: dict):
+    # 当条件字段满足某条件时，目标字段必填
+    condition = rule_def["condition"]
+
+    def _check(sample, schema, _cf=condition["field"], _op=condition["operator"],
+               _cv=condition["value"], _fn=field_name):
+        data = sample.get("data", sample)
+        if not _eval_condition(data.get(_cf), _op, _cv):
+            return True  # 条件不满足时跳过
+        target_val = data.get(_fn)
+        return target_val is not None and str(target_val).strip() != ""
+    return _check
+
+
+def _config_number_range(field_name: str, rule_def: dict):
+    def _check(sample, schema, _fn=field_name, _min=rule_def.get("min"), _max=rule_def.get("max")):
+        val = sample.get("data", sample).get(_fn)
+        if val is None:
+            return True  # 空值由 required 规则检查
+        try:
+            num = float(val)
+        except (ValueError, TypeError):
+            return False
+        if _min is not None and num < _min:
+            return False
+        if _max is not None and num > _max:
+            return False
+        return True
+    return _check
+
+
+# Config "check" type -> builder
+_CONFIG_CHECK_BUILDERS: Dict[str, Callable[[str, dict], Callable[..., bool]]] = {
+    "required": _config_required,
+    "non_empty": _config_non_empty,
+    "min_length": _config_min_length,
+    "max_length": _config_max_length,
+    "regex": _config_regex,
+    "enum": _config_enum,
+    "conditional_required": _config_conditional_required,
+    "number_range": _config_number_range,
+}
+
+
 class RuleSet:
     """A collection of quality check rules."""
 
@@ -224,6 +328,8 @@ class RuleSet:
     def from_config(cls, config_path: str) -> "RuleSet":
         """Load rules from a YAML configuration file.
 
+        Parsed files are cached per process and reparsed when their mtime or
+        size changes. Parsing uses libyaml's CSafeLoader when available.
         Requires PyYAML: pip install knowlyr-datacheck[yaml]
         """
         try:
@@ -231,11 +337,20 @@ class RuleSet:
         except ImportError:
             raise ImportError("YAML 支持需要 PyYAML。请运行: pip install knowlyr-datacheck[yaml]")
 
-        from pathlib import Path
-
         config_path = Path(config_path)
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
+        st = config_path.stat()
+        key = str(config_path.resolve())
+        cached = _CONFIG_CACHE.get(key)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _CONFIG_CACHE.move_to_end(key)
+            config = copy.deepcopy(cached[2])
+        else:
+            with open(config_path, "r", encoding="utf-8") as f:
+                # libyaml's C loader when PyYAML was built with it; same results, faster
+                config = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+            _CONFIG_CACHE[key] = (st.st_mtime_ns, st.st_size, copy.deepcopy(config))
+            while len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+                _CONFIG_CACHE.popitem(last=False)
 
         ruleset = cls(name=config.get("name", config_path.stem))
 
@@ -261,82 +376,13 @@ class RuleSet:
 
     @staticmethod
     def _build_config_check_fn(
-        field_name: str, check_type: str, rule_def: dict  # noqa: C901
+        field_name: str, check_type: str, rule_def: dict
     ) -> Callable[[Dict[str, Any], Dict[str, Any]], bool]:
         """Build a check function from config definition."""
-        if check_type == "required":
-            return lambda sample, schema: field_name in sample.get("data", sample)
-
-        elif check_type == "non_empty":
-            def _check(sample, schema):
-                data = sample.get("data", sample)
-                val = data.get(field_name)
-                if val is None:
-                    return False
-                if isinstance(val, str) and len(val.strip()) == 0:
-                    return False
-                return True
-            return _check
-
-        elif check_type == "min_length":
-            min_len = rule_def.get("value", 1)
-            return lambda sample, schema: len(
-                sample.get("data", sample).get(field_name, "")
-            ) >= min_len
-
-        elif check_type == "max_length":
-            max_len = rule_def.get("value", 100000)
-            return lambda sample, schema: len(
-                sample.get("data", sample).get(field_name, "")
-            ) <= max_len
-
-        elif check_type == "regex":
-            pattern = re.compile(rule_def.get("pattern", ".*"))
-            return lambda sample, schema: bool(
-                pattern.search(sample.get("data", sample).get(field_name, ""))
-            )
-
-        elif check_type == "enum":
-            allowed = set(rule_def.get("values", []))
-            return lambda sample, schema: sample.get("data", sample).get(field_name) in allowed
-
-        elif check_type == "conditional_required":
-            # 当条件字段满足某条件时，目标字段必填
-            cond_field = rule_def["condition"]["field"]
-            operator = rule_def["condition"]["operator"]
-            cond_value = rule_def["condition"]["value"]
-
-            def _check(sample, schema, _cf=cond_field, _op=operator, _cv=cond_value, _fn=field_name):
-                data = sample.get("data", sample)
-                cond_val = data.get(_cf)
-                if not _eval_condition(cond_val, _op, _cv):
-                    return True  # 条件不满足时跳过
-                target_val = data.get(_fn)
-                return target_val is not None and str(target_val).strip() != ""
-            return _check
-
-        elif check_type == "number_range":
-            min_val = rule_def.get("min")
-            max_val = rule_def.get("max")
-
-            def _check(sample, schema, _fn=field_name, _min=min_val, _max=max_val):
-                data = sample.get("data", sample)
-                val = data.get(_fn)
-                if val is None:
-                    return True  # 空值由 required 规则检查
-                try:
-                    num = float(val)
-                except (ValueError, TypeError):
-                    return False
-                if _min is not None and num < _min:
-                    return False
-                if _max is not None and num > _max:
-                    return False
-                return True
-            return _check
-
-        else:
+        builder = _CONFIG_CHECK_BUILDERS.get(check_type)
+        if builder is None:
             raise ValueError(f"未知的检查类型: {check_type}")
+        return builder(field_name, rule_def)
 
     def add_rule(self, rule: Rule):
         """Add a rule to the set."""
@@ -1,8 +1,19 @@
 """Text quality detection rules for LLM data."""
 
+import random
 import re
-from collections import Counter
-from typing import Any, Dict, Set
+import sys
+import zlib
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 
 
 # --- N-gram helpers (for near-duplicate detection) ---
@@ -26,17 +37,194 @@ def jaccard_similarity(set_a: Set[str], set_b: Set[str]) -> float:
     return len(set_a & set_b) / union
 
 
+# --- MinHash LSH (for near-duplicate candidate search) ---
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+@lru_cache(maxsize=None)
+def _minhash_permutations(num_perm: int, seed: int) -> Tuple[Tuple[int, int], ...]:
+    """Random (a, b) pairs for the hash family (a * h + b) % p."""
+    rng = random.Random(seed)
+    return tuple(
+        (rng.randint(1, _MAX_HASH), rng.randint(0, _MAX_HASH)) for _ in range(num_perm)
+    )
+
+
+@lru_cache(maxsize=None)
+def _minhash_permutation_arrays(num_perm: int, seed: int):
+    """Permutation coefficients as (num_perm, 1) numpy columns."""
+    perms = np.array(_minhash_permutations(num_perm, seed), dtype=np.uint64)
+    return perms[:, :1], perms[:, 1:]
+
+
+def minhash_signature(tokens: Iterable[str], num_perm: int = 128, seed: int = 1) -> Tuple[int, ...]:
+    """Compute the MinHash signature of a token set.
+
+    Tokens are hashed with CRC32 so signatures are stable across processes.
+    Uses numpy when available; both paths produce identical signatures.
+    """
+    hashes = [zlib.crc32(t.encode("utf-8")) for t in tokens]
+    if not hashes:
+        return (_MAX_HASH,) * num_perm
+
+    if HAS_NUMPY:
+        a, b = _minhash_permutation_arrays(num_perm, seed)
+        hv = np.array(hashes, dtype=np.uint64)
+        # a, b, h < 2**32, so a * h + b fits in uint64 without overflow
+        phv = ((a * hv + b) % np.uint64(_MERSENNE_PRIME)) & np.uint64(_MAX_HASH)
+        return tuple(phv.min(axis=1).tolist())
+
+    return tuple(
+        min([(a * h + b) % _MERSENNE_PRIME & _MAX_HASH for h in hashes])
+        for a, b in _minhash_permutations(num_perm, seed)
+    )
+
+
+def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) for banded LSH.
+
+    Chooses the most rows per band (fewest false positives) that still make a
+    pair exactly at ``threshold`` a candidate with probability >= 0.99.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands < 0.99:
+            break
+        best = (bands, rows)
+    return best
+
+
+class MinHashLSH:
+    """Banded LSH index over MinHash signatures.
+
+    Signatures are split into bands; two signatures become candidates when any
+    band matches exactly. Candidates still need an exact similarity check.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128):
+        self.num_perm = num_perm
+        self.bands, self.rows = _lsh_params(threshold, num_perm)
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[Hashable]] = defaultdict(list)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows : (band + 1) * rows]
+
+    def insert(self, key: Hashable, signature: Tuple[int, ...]):
+        """Index a signature under ``key``."""
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].append(key)
+
+    def query(self, signature: Tuple[int, ...]) -> Set[Hashable]:
+        """Return keys sharing at least one band with ``signature``."""
+        candidates: Set[Hashable] = set()
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket:
+                candidates.update(bucket)
+        return candidates
+
+
+def _popcount64(x: "np.ndarray") -> "np.ndarray":
+    """Per-element popcount of a uint64 array."""
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(x)
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+class TokenBitsets:
+    """Token sets packed into uint64 bitsets for vectorized Jaccard (requires numpy).
+
+    Tokens that occur in only one set can never be shared, so they are left out
+    of the vocabulary; true set sizes are kept so union = la + lb - inter stays exact.
+    """
+
+    def __init__(self, bits: "np.ndarray", sizes: "np.ndarray"):
+        self.bits = bits
+        self.sizes = sizes
+
+    @classmethod
+    def build(
+        cls, token_sets: Sequence[Set[str]], max_bytes: int = 256 * 1024 * 1024
+    ) -> Optional["TokenBitsets"]:
+        """Pack ``token_sets``; returns None without numpy or above ``max_bytes``."""
+        if not HAS_NUMPY:
+            return None
+        doc_freq = Counter(t for tokens in token_sets for t in tokens)
+        vocab = {t: i for i, t in enumerate(t for t, c in doc_freq.items() if c > 1)}
+        words = max(1, (len(vocab) + 63) // 64)
+        if len(token_sets) * words * 8 > max_bytes:
+            return None
+
+        bits = np.zeros((len(token_sets), words), dtype=np.uint64)
+        for row, tokens in enumerate(token_sets):
+            ids = np.array([vocab[t] for t in tokens if t in vocab], dtype=np.uint64)
+            if ids.size:
+                np.bitwise_or.at(
+                    bits[row], ids >> np.uint64(6), np.uint64(1) << (ids & np.uint64(63))
+                )
+        sizes = np.array([len(tokens) for tokens in token_sets], dtype=np.int64)
+        return cls(bits, sizes)
+
+    def jaccard(self, row: int, others: Sequence[int]) -> "np.ndarray":
+        """Jaccard similarity between set ``row`` and each set in ``others``."""
+        others = np.asarray(others, dtype=np.intp)
+        inter = _popcount64(self.bits[others] & self.bits[row]).sum(axis=1)
+        union = self.sizes[others] + self.sizes[row] - inter
+        return np.divide(inter, union, out=np.zeros(len(others)), where=union > 0)
+
+
 # --- Language detection ---
 
-# Unicode ranges for language detection
+# Unicode ranges for language detection, in tie-break order
 _LANG_RANGES = [
-    ("zh", re.compile(r"[\u4e00-\u9fff\u3400-\u4dbf]")),       # Chinese
-    ("ja", re.compile(r"[\u3040-\u309f\u30a0-\u30ff]")),       # Japanese (Hiragana + Katakana)
-    ("ko", re.compile(r"[\uac00-\ud7af\u1100-\u11ff]")),       # Korean
-    ("ar", re.compile(r"[\u0600-\u06ff\u0750-\u077f]")),       # Arabic
-    ("ru", re.compile(r"[\u0400-\u04ff]")),                     # Cyrillic
-    ("th", re.compile(r"[\u0e00-\u0e7f]")),                     # Thai
+    ("zh", ((0x4E00, 0x9FFF), (0x3400, 0x4DBF))),      # Chinese
+    ("ja", ((0x3040, 0x309F), (0x30A0, 0x30FF))),      # Japanese (Hiragana + Katakana)
+    ("ko", ((0xAC00, 0xD7AF), (0x1100, 0x11FF))),      # Korean
+    ("ar", ((0x0600, 0x06FF), (0x0750, 0x077F))),      # Arabic
+    ("ru", ((0x0400, 0x04FF),)),                       # Cyrillic
+    ("th", ((0x0E00, 0x0E7F),)),                       # Thai
+    ("latin", ((0x41, 0x5A), (0x61, 0x7A))),           # a-z, A-Z
 ]
+_LANG_CODES = [lang for lang, _ in _LANG_RANGES]
+
+
+def _build_lang_lut() -> bytearray:
+    """BMP code point -> 1-based index into _LANG_RANGES (0 for none)."""
+    lut = bytearray(0x10000)
+    for bucket, (_, ranges) in enumerate(_LANG_RANGES, 1):
+        for lo, hi in ranges:
+            lut[lo : hi + 1] = bytes([bucket]) * (hi - lo + 1)
+    return lut
+
+
+# Every range lies in the BMP, so astral characters (and, on the numpy path,
+# their UTF-16 surrogate units) fall in bucket 0
+_LANG_LUT = _build_lang_lut()
+if HAS_NUMPY:
+    _LANG_LUT_NP = np.frombuffer(bytes(_LANG_LUT), dtype=np.uint8)
+
+
+def _lang_bucket_counts(text: str) -> List[int]:
+    """Characters of ``text`` per language bucket, in one pass."""
+    if HAS_NUMPY:
+        codes = np.frombuffer(text.encode("utf-16-le", "surrogatepass"), dtype=np.uint16)
+        return np.bincount(_LANG_LUT_NP[codes], minlength=len(_LANG_RANGES) + 1).tolist()
+    # Counter tallies in C; only the distinct characters are looked up here
+    counts = [0] * (len(_LANG_RANGES) + 1)
+    lut = _LANG_LUT
+    for ch, n in Counter(text).items():
+        code = ord(ch)
+        if code < 0x10000:
+            counts[lut[code]] += n
+    return counts
 
 
 def detect_language(text: str) -> tuple:
@@ -49,29 +237,77 @@ def detect_language(text: str) -> tuple:
     if not text or len(text.strip()) < 3:
         return ("unknown", 0.0)
 
-    total_alpha = 0
-    lang_counts: Dict[str, int] = {}
-
-    for lang, pattern in _LANG_RANGES:
-        count = len(pattern.findall(text))
-        if count > 0:
-            lang_counts[lang] = count
-            total_alpha += count
-
-    # Count Latin characters
-    latin_count = len(re.findall(r"[a-zA-Z]", text))
-    if latin_count > 0:
-        lang_counts["latin"] = latin_count
-        total_alpha += latin_count
-
+    lang_counts = _lang_bucket_counts(text)[1:]
+    total_alpha = sum(lang_counts)
     if total_alpha == 0:
         return ("unknown", 0.0)
 
-    # Find dominant language
-    dominant = max(lang_counts, key=lang_counts.get)
-    confidence = lang_counts[dominant] / total_alpha
-
-    return (dominant, round(confidence, 2))
+    # Find dominant language; ties go to the earlier range
+    top = max(lang_counts)
+    dominant = _LANG_CODES[lang_counts.index(top)]
+    return (dominant, round(top / total_alpha, 2))
+
+
+# Character classes counted by cjk_latin_counts (matched in C by re). Runs are
+# matched whole so CJK-heavy text yields one match per run, not per character.
+_CJK_RUN_RE = re.compile(r"[\u4e00-\u9fff\u3400-\u4dbf]+")
+# bytes.translate delete table keeping only 0x41-0x7A; in UTF-8 those byte values
+# only occur as the ASCII characters themselves
+_NON_LATIN_RANGE_BYTES = bytes(i for i in range(256) if not 0x41 <= i <= 0x7A)
+
+
+def cjk_latin_counts(
+    texts: Sequence[str], max_chars: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """Count CJK (U+4E00-U+9FFF, Ext-A U+3400-U+4DBF) and U+0041-U+007A chars per text.
+
+    Only the first ``max_chars`` characters of each text are counted when given, so
+    callers pass whole texts and leave the bounding to this function. A text longer
+    than ``max_chars`` is cut once, inside the call: the C-level encoders need a
+    contiguous head, and an ``endpos``-bounded regex scan measured ~8x slower.
+    All-ASCII texts are counted with one bytes.translate. With numpy, the rest are
+    scanned as one concatenated UTF-16 code unit array: both ranges lie in the BMP
+    and surrogate units (U+D800-U+DFFF) match neither, so 2-byte units give the
+    same counts as full code points at half the memory.
+    """
+    end = sys.maxsize if max_chars is None else max_chars
+    counts: List[Tuple[int, int]] = []
+    wide: List[Tuple[int, str]] = []  # (position, head) of non-ASCII texts
+    for text in texts:
+        head = text if len(text) <= end else text[:end]
+        if head.isascii():
+            # isascii() is a C-level word scan; ASCII has no CJK to look for
+            counts.append((0, len(head.encode("ascii").translate(None, _NON_LATIN_RANGE_BYTES))))
+        elif not HAS_NUMPY:
+            # CJK: C-level regex scan; Latin: one bytes.translate
+            encoded = head.encode("utf-8", "surrogatepass")
+            latin = len(encoded.translate(None, _NON_LATIN_RANGE_BYTES))
+            counts.append((sum(map(len, _CJK_RUN_RE.findall(head))), latin))
+        else:
+            wide.append((len(counts), head))
+            counts.append((0, 0))
+    if not wide:
+        return counts
+
+    encoded = [head.encode("utf-16-le", "surrogatepass") for _, head in wide]
+    codes = np.frombuffer(b"".join(encoded), dtype=np.uint16)
+    # Lengths in code units: astral characters take two
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)) // 2
+    starts = np.cumsum(lengths) - lengths
+
+    def _per_text(mask: "np.ndarray") -> "np.ndarray":
+        # Non-ASCII heads are never empty, so no reduceat segment is empty
+        return np.add.reduceat(mask, starts, dtype=np.int64)
+
+    def _in_range(lo: int, hi: int) -> "np.ndarray":
+        # lo <= c <= hi as one compare: uint16 subtraction wraps values below lo
+        return (codes - np.uint16(lo)) <= np.uint16(hi - lo)
+
+    cjk = _per_text(_in_range(0x4E00, 0x9FFF) | _in_range(0x3400, 0x4DBF))
+    latin = _per_text(_in_range(0x41, 0x7A))
+    for (pos, _), c, lt in zip(wide, cjk.tolist(), latin.tolist()):
+        counts[pos] = (c, lt)
+    return counts
 
 
 def check_language_consistency(sample: Dict[str, Any], schema: Dict[str, Any]) -> bool:
@@ -138,6 +374,10 @@ def check_garbled_text(sample: Dict[str, Any], schema: Dict[str, Any]) -> bool:
 
 # --- Repetitive text detection ---
 
+_SENTENCE_SPLIT_RE = re.compile(r"[。！？\n.!?]+")
+# Consecutive non-overlapping 10-character blocks
+_WINDOW_RE = re.compile(r".{10}", re.DOTALL)
+
 
 def check_repetitive_text(sample: Dict[str, Any], schema: Dict[str, Any]) -> bool:
     """Check if text contains excessive repetition. Returns False if repetitive."""
@@ -147,7 +387,7 @@ def check_repetitive_text(sample: Dict[str, Any], schema: Dict[str, Any]) -> boo
             continue
 
         # Split into sentences
-        segments = re.split(r"[。！？\n.!?]+", value)
+        segments = _SENTENCE_SPLIT_RE.split(value)
         segments = [s.strip() for s in segments if len(s.strip()) > 5]
 
         if len(segments) >= 3:
@@ -158,14 +398,10 @@ def check_repetitive_text(sample: Dict[str, Any], schema: Dict[str, Any]) -> boo
 
         # Character-level repetition (e.g., same 10-char block repeated)
         if len(value) > 100:
-            window_size = 10
-            windows = [
-                value[i : i + window_size]
-                for i in range(0, len(value) - window_size, window_size)
-            ]
+            # Blocks start at 0, 10, ... below len - 10; findall slices them in C
+            windows = _WINDOW_RE.findall(value, 0, len(value) - 1)
             if windows:
-                window_counter = Counter(windows)
-                top_count = window_counter.most_common(1)[0][1]
+                top_count = max(Counter(windows).values())
                 if top_count / len(windows) > 0.5 and top_count > 3:
                     return False
 
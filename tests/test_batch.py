@@ -60,6 +60,12 @@ class TestCheckDirectory:
         assert result.total_files == 1
         assert any("val.jsonl" in k for k in result.file_results)
 
+    def test_collect_files(self, batch_dir):
+        files = DataChecker.collect_files(batch_dir)
+        assert [f.relative_to(batch_dir).as_posix() for f in files] == [
+            "sub/test.csv", "train.json", "val.jsonl",
+        ]
+
     def test_empty_directory(self, tmp_path):
         checker = DataChecker()
         result = checker.check_directory(str(tmp_path))
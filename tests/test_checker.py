@@ -251,6 +251,58 @@ class TestRuleSet:
         ruleset.add_rule(custom_rule)
         assert "custom_rule" in ruleset.rules
 
+    def test_severity_icon(self):
+        """Test severity levels expose a display icon."""
+        assert Severity.ERROR.icon == "🔴"
+        assert Severity.WARNING.icon == "🟡"
+        assert Severity.INFO.icon == "🔵"
+
+    def test_config_check_fns(self):
+        """Test check functions built from config rule definitions."""
+        build = RuleSet._build_config_check_fn
+
+        regex = build("text", "regex", {"pattern": "^x"})
+        assert regex({"data": {"text": "xyz"}}, {}) is True
+        assert regex({"text": "abc"}, {}) is False
+
+        enum = build("label", "enum", {"values": ["a", "b"]})
+        assert enum({"label": "a"}, {})
+        assert not enum({"label": "c"}, {})
+
+        number = build("score", "number_range", {"min": 1, "max": 5})
+        assert number({"score": 3}, {})
+        assert not number({"score": 9}, {})
+        assert not number({"score": "x"}, {})
+        assert number({}, {})
+
+        conditional = build(
+            "reason", "conditional_required",
+            {"condition": {"field": "score", "operator": "<", "value": 3}},
+        )
+        assert conditional({"score": 4}, {})
+        assert not conditional({"score": 1, "reason": " "}, {})
+
+        with pytest.raises(ValueError):
+            build("text", "unknown", {})
+
+    def test_from_config_reloads_changed_file(self, tmp_path):
+        """Test cached configs give fresh rule sets and pick up file edits."""
+        pytest.importorskip("yaml")
+        path = tmp_path / "rules.yaml"
+        path.write_text("rules:\n  - field: a\n    check: required\n", encoding="utf-8")
+
+        first = RuleSet.from_config(str(path))
+        first.enable_rule("config_a_required_0", False)
+        second = RuleSet.from_config(str(path))
+        assert second.rules["config_a_required_0"].enabled is True
+
+        path.write_text(
+            "rules:\n  - field: a\n    check: required\n  - field: b\n    check: non_empty\n",
+            encoding="utf-8",
+        )
+        third = RuleSet.from_config(str(path))
+        assert "config_b_non_empty_1" in third.rules
+
 
 class TestInferSchema:
     """Tests for schema inference."""
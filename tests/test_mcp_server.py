@@ -0,0 +1,337 @@
+"""Tests for the MCP server tool handlers."""
+
+import asyncio
+import json
+import os
+import re
+from array import array
+from collections import Counter, OrderedDict
+
+import pytest
+
+pytest.importorskip("mcp")
+
+from mcp.types import CallToolRequest, CallToolRequestParams  # noqa: E402
+
+from datacheck import mcp_server  # noqa: E402
+
+
+def _write_jsonl(path, rows):
+    path.write_text(
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows), encoding="utf-8"
+    )
+    return str(path)
+
+
+def _call_tool(name, arguments):
+    """Call a tool through the server's registered CallToolRequest handler."""
+    server = mcp_server.create_server()
+    request = CallToolRequest(
+        method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments)
+    )
+    return asyncio.run(server.request_handlers[CallToolRequest](request)).root
+
+
+class TestCallTool:
+    """Tests for tool dispatch and argument validation."""
+
+    def test_schema_rejection_is_error(self, tmp_path):
+        train = _write_jsonl(tmp_path / "train.jsonl", [{"text": "hello world"}])
+        result = _call_tool("check_leakage", {"train_path": train})
+
+        assert result.isError is True
+        assert "test_path" in result.content[0].text
+
+    def test_valid_call_is_not_error(self, tmp_path):
+        data = _write_jsonl(tmp_path / "data.jsonl", [{"text": "hello world"}])
+        result = _call_tool("check_coverage", {"data_path": data})
+
+        assert result.isError is False
+        assert "数据覆盖度检测" in result.content[0].text
+
+
+def _run(handler, arguments):
+    return asyncio.run(handler(arguments))[0].text
+
+
+def _count(text, label):
+    match = re.search(rf"{label}: (\d+) 条", text)
+    return int(match.group(1))
+
+
+def _doc(prefix, n, replace=()):
+    """Space-separated tokens ``prefix_0 .. prefix_{n-1}``, with some swapped out."""
+    return " ".join(
+        f"x{prefix}_{k}" if k in replace else f"{prefix}_{k}" for k in range(n)
+    )
+
+
+class TestLeakage:
+    """Tests for check_leakage exact and near-duplicate counts."""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        train = [{"text": _doc(f"d{i}", 20)} for i in range(30)]
+        test = [
+            {"text": _doc("d0", 20)},  # exact
+            {"text": _doc("d1", 20)},  # exact
+            {"text": _doc("d2", 20, replace={19})},  # Jaccard 19/21 = 0.905
+            {"text": _doc("d3", 20, replace={18, 19})},  # Jaccard 18/22 = 0.818
+            {"text": _doc("other", 20)},
+        ]
+        return (
+            _write_jsonl(tmp_path / "train.jsonl", train),
+            _write_jsonl(tmp_path / "test.jsonl", test),
+        )
+
+    @pytest.mark.parametrize("threshold, near", [(0.95, 0), (0.9, 1), (0.8, 2)])
+    def test_counts_by_threshold(self, files, threshold, near):
+        train, test = files
+        text = _run(mcp_server._handle_check_leakage, {
+            "train_path": train, "test_path": test,
+            "key_fields": ["text"], "threshold": threshold,
+        })
+
+        assert _count(text, "完全重复") == 2
+        assert _count(text, "近似重复") == near
+
+    def test_bitset_branch_matches_set_branch(self, tmp_path, monkeypatch):
+        pytest.importorskip("numpy")
+        # 80 train docs one or two tokens away from a shared base, so querying the
+        # base returns most of them as LSH candidates
+        train = [{"text": _doc("base", 30, replace={k})} for k in range(30)]
+        train += [{"text": _doc("base", 30, replace={k, (k + 1) % 30})} for k in range(30)]
+        train += [{"text": _doc("base", 30, replace={k, (k + 7) % 30})} for k in range(20)]
+        test = [{"text": _doc("base", 30)}]  # Jaccard 29/31 with the one-token docs
+        test += [{"text": _doc("base", 30, replace=set(range(k, k + 10)))} for k in range(5)]
+        test += [{"text": _doc(f"u{k}", 30)} for k in range(5)]
+        args = {
+            "train_path": _write_jsonl(tmp_path / "train.jsonl", train),
+            "test_path": _write_jsonl(tmp_path / "test.jsonl", test),
+            "key_fields": ["text"],
+            "threshold": 0.9,
+        }
+
+        built = []
+        build = mcp_server.TokenBitsets.build
+        monkeypatch.setattr(
+            mcp_server.TokenBitsets, "build",
+            lambda token_sets: built.append(1) or build(token_sets),
+        )
+        bitset_text = _run(mcp_server._handle_check_leakage, args)
+        assert built  # candidate lists reached _BITSET_MIN_CANDIDATES
+
+        monkeypatch.setattr(mcp_server, "_BITSET_MIN_CANDIDATES", 10**9)
+        set_text = _run(mcp_server._handle_check_leakage, args)
+
+        assert _count(bitset_text, "近似重复") == _count(set_text, "近似重复") == 1
+        assert _count(bitset_text, "完全重复") == 0
+
+
+class TestDriftStatistics:
+    """Tests for the KS / TV statistics used by check_drift."""
+
+    @pytest.mark.parametrize("has_numpy", [True, False])
+    def test_ks_statistic(self, monkeypatch, has_numpy):
+        if has_numpy:
+            pytest.importorskip("numpy")
+        monkeypatch.setattr(mcp_server, "HAS_NUMPY", has_numpy)
+
+        assert mcp_server._ks_statistic(array("d", [1, 2, 3]), array("d", [4, 5, 6])) == 1.0
+        assert mcp_server._ks_statistic(
+            array("d", [1, 2, 3, 4]), array("d", [3, 4, 5, 6])
+        ) == pytest.approx(0.5)
+        assert mcp_server._ks_statistic(array("d", [1, 2]), array("d", [1, 2])) == 0.0
+
+    def test_tv_distance(self):
+        assert mcp_server._tv_distance(Counter(a=1, b=1), Counter(a=1)) == pytest.approx(0.5)
+        assert mcp_server._tv_distance(Counter(a=2, b=2), Counter(a=5, b=5)) == 0.0
+        assert mcp_server._tv_distance(Counter(a=1), Counter(b=3)) == pytest.approx(1.0)
+
+    def test_drift_flagging(self, tmp_path):
+        rows_a = [{"score": i, "label": "ab"[i % 2]} for i in range(100)]
+        rows_b = [{"score": i + 50, "label": "ab"[i % 2]} for i in range(100)]
+        text = _run(mcp_server._handle_check_drift, {
+            "data_path_a": _write_jsonl(tmp_path / "a.jsonl", rows_a),
+            "data_path_b": _write_jsonl(tmp_path / "b.jsonl", rows_b),
+        })
+
+        assert "KS 统计量: 0.500 (**漂移**)" in text
+        assert "TV 距离: 0.000 (稳定)" in text
+        assert "**漂移字段 (1): score**" in text
+
+    def test_no_drift(self, tmp_path):
+        rows = [{"score": i, "label": "ab"[i % 2]} for i in range(100)]
+        text = _run(mcp_server._handle_check_drift, {
+            "data_path_a": _write_jsonl(tmp_path / "a.jsonl", rows),
+            "data_path_b": _write_jsonl(tmp_path / "b.jsonl", rows),
+        })
+
+        assert "**未检测到明显漂移**" in text
+
+    def test_high_cardinality_categorical_is_reported(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(mcp_server, "_DRIFT_MAX_DISTINCT", 5)
+        rows = [{"label": f"c{i % 8}", "text": f"free text number {i}"} for i in range(200)]
+        text = _run(mcp_server._handle_check_drift, {
+            "data_path_a": _write_jsonl(tmp_path / "a.jsonl", rows),
+            "data_path_b": _write_jsonl(tmp_path / "b.jsonl", rows),
+        })
+
+        assert "### 字段: `label` (类型: categorical)" in text
+        assert "不同取值超过 5 个，未统计类别分布，未计算 TV 距离" in text
+        assert "### 字段: `text` (类型: text)" in text
+
+
+class TestCheckCache:
+    """Tests for check_data_quality result caching."""
+
+    def test_cache_hit_and_invalidation(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(mcp_server, "_CHECK_CACHE", OrderedDict())
+        calls = []
+        run_check = mcp_server._run_check
+
+        async def counting_run_check(*args, **kwargs):
+            calls.append(args)
+            return await run_check(*args, **kwargs)
+
+        monkeypatch.setattr(mcp_server, "_run_check", counting_run_check)
+        path = tmp_path / "data.jsonl"
+        _write_jsonl(path, [{"instruction": "What is AI?", "response": "Artificial intelligence."}])
+        args = {"data_path": str(path)}
+
+        first = _run(mcp_server._handle_check_data_quality, args)
+        second = _run(mcp_server._handle_check_data_quality, args)
+        assert len(calls) == 1
+        assert first == second
+        # Only the rendered summary is kept, not the full CheckResult
+        assert list(mcp_server._CHECK_CACHE.values()) == [first]
+
+        _write_jsonl(path, [
+            {"instruction": "What is AI?", "response": "Artificial intelligence."},
+            {"instruction": "", "response": ""},
+        ])
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        third = _run(mcp_server._handle_check_data_quality, args)
+        assert len(calls) == 2
+        assert "总样本: 2" in third
+
+
+class TestBatchCheck:
+    """Tests for batch_check_directory."""
+
+    def test_process_pool_path(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(mcp_server, "_OFFLOAD_MIN_BYTES", 0)
+        monkeypatch.setattr(mcp_server, "_EXECUTOR", None)
+        for name, rows in [
+            ("a.jsonl", [{"instruction": "What is AI?", "response": "Artificial intelligence."}]),
+            ("b.jsonl", [{"instruction": "", "response": ""}]),
+        ]:
+            _write_jsonl(tmp_path / name, rows)
+
+        try:
+            text = _run(mcp_server._handle_batch_check_directory, {
+                "directory": str(tmp_path), "max_workers": 2,
+            })
+            assert mcp_server._EXECUTOR is not None  # files went through the shared pool
+            assert mcp_server._MP_CONTEXT.get_start_method() != "fork"
+        finally:
+            if mcp_server._EXECUTOR is not None:
+                mcp_server._EXECUTOR.shutdown()
+
+        assert "文件数: 2" in text
+        assert "| a.jsonl | 1 | 100.0%" in text
+        assert "| b.jsonl | 1 | 0.0%" in text
+
+
+class TestBiasLanguage:
+    """Tests for check_bias language labelling and its label cache."""
+
+    def test_language_labels_use_text_head(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(mcp_server, "_LANG_LABEL_CACHE", OrderedDict())
+        rows = [
+            {"text": "这是一段足够长的中文文本，用于检测语言分布是否正确统计。" * 3},
+            {"text": "An English sentence that is long enough for the text field. " * 2},
+            # Only the first 500 characters count
+            {"text": "a" * 500 + "中" * 1000},
+        ]
+        text = _run(mcp_server._handle_check_bias, {
+            "data_path": _write_jsonl(tmp_path / "data.jsonl", rows),
+            "text_field": "text",
+            "dimensions": ["language"],
+        })
+
+        assert "- en: 2 (66.7%)" in text
+        assert "- zh: 1 (33.3%)" in text
+
+    def test_cache_holds_leading_texts_only(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(mcp_server, "_LANG_LABEL_CACHE", OrderedDict())
+        monkeypatch.setattr(mcp_server, "_LANG_LABEL_CACHE_SIZE", 4)
+        monkeypatch.setattr(mcp_server, "_LANG_BATCH_SIZE", 2)
+        scanned = []
+        counts = mcp_server.cjk_latin_counts
+
+        def counting(texts, max_chars=None):
+            scanned.extend(texts)
+            return counts(texts, max_chars)
+
+        monkeypatch.setattr(mcp_server, "cjk_latin_counts", counting)
+        rows = [{"text": f"sample number {i} " + "word " * (i + 100)} for i in range(10)]
+        args = {
+            "data_path": _write_jsonl(tmp_path / "data.jsonl", rows),
+            "text_field": "text",
+            "dimensions": ["language"],
+        }
+
+        first = _run(mcp_server._handle_check_bias, args)
+        assert len(scanned) == 10
+        assert len(mcp_server._LANG_LABEL_CACHE) == 4
+
+        scanned.clear()
+        second = _run(mcp_server._handle_check_bias, args)
+        assert len(scanned) == 6  # the first four labels come from the cache
+        assert first == second
+
+    def test_texts_are_bounded_only_by_cjk_latin_counts(self, monkeypatch):
+        monkeypatch.setattr(mcp_server, "_LANG_LABEL_CACHE", OrderedDict())
+        calls = []
+        counts = mcp_server.cjk_latin_counts
+
+        def recording(texts, max_chars=None):
+            calls.append((texts, max_chars))
+            return counts(texts, max_chars)
+
+        monkeypatch.setattr(mcp_server, "cjk_latin_counts", recording)
+        texts = ["x" * 2000, "中文" * 400]
+        lang_counter = Counter()
+        mcp_server._classify_languages(texts, lang_counter)
+
+        (passed, max_chars), = calls
+        assert max_chars == 500
+        assert all(a is b for a, b in zip(passed, texts))  # whole texts, not slices
+        assert lang_counter == Counter(en=1, zh=1)
+
+
+class TestBufferedStdout:
+    """Tests for the stdout wrapper handed to stdio_server."""
+
+    def test_writes_reach_fd_on_flush(self, monkeypatch):
+        read_fd, write_fd = os.pipe()
+
+        class _Stdout:
+            def fileno(self):
+                return write_fd
+
+        monkeypatch.setattr(mcp_server.sys, "stdout", _Stdout())
+
+        async def _write():
+            out = mcp_server._buffered_stdout()
+            await out.write("中文 message\n")
+            await out.flush()
+
+        try:
+            asyncio.run(_write())
+            assert os.read(read_fd, 1024).decode("utf-8") == "中文 message\n"
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
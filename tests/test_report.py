@@ -117,6 +117,26 @@ class TestQualityReport:
 
         assert "自定义标题" in md
 
+    def test_generated_at_shared_across_formats(self, sample_result):
+        """Test all formats of one report carry the same timestamp."""
+        report = QualityReport(sample_result)
+        generated_at = report.to_json()["generated_at"]
+        stamp = generated_at[:19].replace("T", " ")
+
+        assert f"生成时间: {stamp}" in report.to_markdown()
+        assert f"生成时间: {stamp}" in report.to_html()
+        assert report.to_json()["generated_at"] == generated_at
+
+    def test_grade_follows_result_changes(self, sample_result):
+        """Test the grade is read from the result at render time."""
+        report = QualityReport(sample_result)
+        sample_result.pass_rate = 0.35
+
+        md = report.to_markdown()
+        assert "🔴 需改进" in md
+        assert "35.0%" in md
+        assert "需改进" in report.to_html()
+
 
 class TestHTMLReport:
     """Tests for HTML report generation."""
@@ -143,6 +163,22 @@ class TestHTMLReport:
         assert "重复检测" in html
         assert "sample_5" in html
 
+    def test_html_escapes_data(self):
+        result = CheckResult(
+            pass_rate=1.0,
+            total_samples=2,
+            rule_results={
+                "r": {"name": "<b>规则</b>", "passed": 2, "failed": 0, "failed_samples": []},
+            },
+            duplicates=[["a&b", "<c>"]],
+        )
+        html = QualityReport(result, title="T <x>").to_html()
+
+        assert "<b>规则</b>" not in html
+        assert "&lt;b&gt;规则&lt;/b&gt;" in html
+        assert "a&amp;b, &lt;c&gt;" in html
+        assert "<title>T &lt;x&gt;</title>" in html
+
     def test_html_grade_colors(self):
         # Excellent
         result = CheckResult(pass_rate=0.95, total_samples=100)
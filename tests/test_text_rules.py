@@ -8,9 +8,13 @@ from datacheck.text_rules import (
     check_pii,
     check_repetitive_text,
     check_language_consistency,
+    cjk_latin_counts,
     compute_ngrams,
     detect_language,
     jaccard_similarity,
+    minhash_signature,
+    MinHashLSH,
+    TokenBitsets,
 )
 
 
@@ -128,6 +132,50 @@ class TestNgramHelpers:
         assert jaccard_similarity(set(), set()) == 1.0
 
 
+class TestMinHashLSH:
+    """Tests for MinHash signatures and LSH candidate search."""
+
+    def test_signature_deterministic(self):
+        tokens = {"the", "quick", "brown", "fox"}
+        sig = minhash_signature(tokens, num_perm=64)
+        assert len(sig) == 64
+        assert sig == minhash_signature(set(tokens), num_perm=64)
+
+    def test_signature_pure_python_matches_numpy(self, monkeypatch):
+        import datacheck.text_rules as text_rules
+
+        if not text_rules.HAS_NUMPY:
+            pytest.skip("numpy not installed")
+        tokens = [f"tok{i}" for i in range(40)]
+        with_numpy = minhash_signature(tokens)
+        monkeypatch.setattr(text_rules, "HAS_NUMPY", False)
+        assert minhash_signature(tokens) == with_numpy
+
+    def test_query_finds_near_duplicate(self):
+        base = [f"w{i}" for i in range(30)]
+        near = base[1:] + ["other"]
+        unrelated = [f"x{i}" for i in range(30)]
+
+        lsh = MinHashLSH(threshold=0.9)
+        lsh.insert("base", minhash_signature(base, lsh.num_perm))
+        lsh.insert("unrelated", minhash_signature(unrelated, lsh.num_perm))
+
+        assert lsh.query(minhash_signature(near, lsh.num_perm)) == {"base"}
+
+    def test_bands_fit_num_perm(self):
+        lsh = MinHashLSH(threshold=0.8, num_perm=128)
+        assert lsh.bands * lsh.rows <= 128
+
+    def test_bitset_jaccard_matches_sets(self):
+        sets = [{"a", "b", "c"}, {"b", "c", "d"}, {"x", "y"}, {"a", "b", "c", "only"}]
+        bitsets = TokenBitsets.build(sets)
+        if bitsets is None:
+            pytest.skip("numpy not installed")
+        sims = bitsets.jaccard(0, [1, 2, 3])
+        expected = [jaccard_similarity(sets[0], sets[i]) for i in (1, 2, 3)]
+        assert list(sims) == pytest.approx(expected)
+
+
 class TestLanguageDetection:
     """Tests for language detection."""
 
@@ -170,6 +218,15 @@ class TestLanguageDetection:
         sample = {"data": {"text": "Just one field here"}}
         assert check_language_consistency(sample, {}) is True
 
+    def test_cjk_latin_counts(self):
+        texts = ["中文abc", "", "hello 世界!", "123"]
+        assert cjk_latin_counts(texts) == [(2, 3), (0, 0), (2, 5), (0, 0)]
+        assert cjk_latin_counts(texts, max_chars=3) == [(2, 1), (0, 0), (0, 3), (0, 0)]
+        # CJK Extension A counts as CJK, like detect_language's zh range
+        assert cjk_latin_counts(["\u3400\u4dbf\u4e00"]) == [(3, 0)]
+        # Astral characters (emoji, CJK Ext-B) are counted as neither
+        assert cjk_latin_counts(["😀a中\U00020000b", "x"]) == [(1, 2), (0, 1)]
+
 
 class TestNearDuplicateDetection:
     """Tests for near-duplicate detection in DataChecker."""